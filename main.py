@@ -1,9 +1,15 @@
-from src.chat.agent import ChatAgent
+from typing import TYPE_CHECKING, List, Optional
 from src.config import Config
 from src.utils.logger import setup_logger
 from pathlib import Path
-from langchain.schema import SystemMessage, HumanMessage
+import argparse
 import json
+import sys
+
+# ChatAgent 会间接导入 langchain-openai 等重量级依赖，仅在类型检查时于模块顶层导入，
+# 运行时推迟到真正需要时再导入，以缩短程序启动时间
+if TYPE_CHECKING:
+    from src.chat.agent import ChatAgent
 
 logger = setup_logger(__name__)
 
@@ -26,11 +32,33 @@ SYSTEM_PROMPT = """你是一个专业的百科问答助手。你的任务是回
 1. 保持客观准确
 2. 解释要清晰易懂
 3. 适当举例说明
-4. 必要时提供补充信息
+4. 必要时提供补充信息"""
+
+# Few-shot 提示，非简单模式下与示例一起拼接到系统提示之后
+FEW_SHOT_PROMPT = "请参考以下示例来理解回答风格："
 
-请参考以下示例来理解回答风格："""
+# 系统消息在首次使用时构建并缓存，避免每轮对话重复构造
+_SYSTEM_MESSAGE = None
 
-def process_content(content: str, agent: ChatAgent) -> None:
+def build_system_prompt(simple: bool = False) -> str:
+    """
+    构建系统提示
+    
+    Args:
+        simple: 是否使用简单模式（不附带 few-shot 示例）
+    
+    Returns:
+        str: 系统提示文本
+    """
+    if simple:
+        return SYSTEM_PROMPT
+    examples = "\n\n".join(
+        f"用户: {example['user']}\n助手: {example['assistant']}"
+        for example in FEW_SHOT_EXAMPLES
+    )
+    return f"{SYSTEM_PROMPT}\n\n{FEW_SHOT_PROMPT}\n\n{examples}"
+
+def process_content(content: str, agent: "ChatAgent") -> None:
     """
     处理内容并显示回复
     
@@ -38,36 +66,51 @@ def process_content(content: str, agent: ChatAgent) -> None:
         content: 用户输入的内容
         agent: 对话代理实例
     """
+    global _SYSTEM_MESSAGE
+    from langchain.schema import SystemMessage, HumanMessage
+    
     try:
         # 构建系统消息和人类消息
-        system_message = SystemMessage(content=SYSTEM_PROMPT)
+        if _SYSTEM_MESSAGE is None:
+            _SYSTEM_MESSAGE = SystemMessage(content=build_system_prompt())
+        system_message = _SYSTEM_MESSAGE
         human_message = HumanMessage(content=content)
         
-        # 获取 AI 回复和思考过程
-        response, thinking = agent.chat([system_message, human_message])
-        
-        # 显示思考过程
-        print("\n思考过程:")
-        print("-" * 50)
-        print(thinking)
-        print("-" * 50)
-        
-        # 显示最终回复
-        print(f"\n助手: {response}")
+        # 流式显示 AI 回复（包含思考过程和最终答案），首个片段到达即开始输出
+        sys.stdout.write("\n助手: ")
+        for token in agent.chat_stream([system_message, human_message]):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
         
     except Exception as e:
-        logger.error(f"处理内容时出错: {str(e)}")
-        print(f"处理内容时出错: {str(e)}")
+        logger.error("处理内容时出错: %s", e)
+        print(f"处理内容时出错: {e}")
 
-def main():
-    """主程序入口函数"""
-    print("程序开始运行...")
+def main(argv: Optional[List[str]] = None):
+    """
+    主程序入口函数
+    
+    Args:
+        argv: 命令行参数，为 None 时读取 sys.argv
+    """
+    global _SYSTEM_MESSAGE
+    parser = argparse.ArgumentParser(description="AI 百科问答助手")
+    parser.add_argument("--simple", action="store_true", help="简单模式：系统提示不附带 few-shot 示例")
+    args = parser.parse_args(argv)
+    
+    # 状态信息走 logger.debug，标准输出只保留交互内容；行缓冲保证提示及时显示
+    sys.stdout.reconfigure(line_buffering=True)
+    logger.debug("程序开始运行...")
     try:
-        print("正在验证配置...")
+        logger.debug("正在验证配置...")
         Config.validate_config()
         
-        print("正在初始化对话代理...")
+        logger.debug("正在初始化对话代理...")
+        from src.chat.agent import ChatAgent
+        from langchain.schema import SystemMessage
         agent = ChatAgent()
+        _SYSTEM_MESSAGE = SystemMessage(content=build_system_prompt(args.simple))
         
         print("欢迎使用 AI 百科问答助手！")
         print("输入 'quit' 退出")
@@ -76,19 +119,18 @@ def main():
         print("-" * 50)
         
         while True:
-            print("\n等待用户输入...")
             user_input = input("\n请输入你的问题: ").strip()
             if not user_input:
-                print("输入为空，继续等待...")
+                logger.debug("输入为空，继续等待...")
                 continue
                 
             if user_input.lower() == 'quit':
-                print("用户选择退出...")
+                logger.debug("用户选择退出...")
                 print("感谢使用，再见！")
                 break
                 
             if user_input.lower() == 'clear':
-                print("用户选择清空历史...")
+                logger.debug("用户选择清空历史...")
                 agent.clear_history()
                 print("对话历史已清空")
                 continue
@@ -97,19 +139,17 @@ def main():
                 print("\nFew-shot 示例:")
                 for i, example in enumerate(FEW_SHOT_EXAMPLES, 1):
                     print(f"\n示例 {i}:")
-                    print(f"用户: {example['  user']}")
+                    print(f"用户: {example['user']}")
                     print(f"助手: {example['assistant']}")
                 continue 
             
             process_content(user_input, agent)
                 
     except Exception as e:
-        logger.error(f"程序运行出错: {str(e)}")
-        print(f"程序出错: {str(e)}")
-        print(f"错误类型: {type(e)}")
-        import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        # logger.exception 只在日志实际输出时才格式化异常堆栈
+        logger.exception("程序运行出错")
+        print(f"程序出错: {e}")
 
 if __name__ == "__main__":
-    print("程序启动...")
+    logger.debug("程序启动...")
     main() 
\ No newline at end of file
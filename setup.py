@@ -19,6 +19,14 @@ from setuptools import setup, find_packages
    - 版本固定，确保稳定性
    - 包含数据处理、AI 对话等核心功能
 
+   加速依赖（extras_require）：
+   - 可选安装，未安装时自动回退到纯 NumPy / 标准库实现
+   - 通过 [speedups] 选项安装
+
+   本地嵌入依赖（extras_require）：
+   - 知识库在本地计算文本嵌入，需在 KnowledgeBase 中通过 embedding_model 参数显式启用
+   - 通过 [local] 选项安装
+
    开发依赖（extras_require）：
    - 仅在开发时需要的工具
    - 代码质量、测试、类型检查等
@@ -29,6 +37,12 @@ setup(
     name="aichat",
     version="0.1.0",
     packages=find_packages(),
+    py_modules=["main"],
+    entry_points={
+        "console_scripts": [
+            "aichat = main:main",  # 命令行入口
+        ]
+    },
     install_requires=[
         # 核心依赖
         "pandas==2.2.1",        # 数据处理
@@ -36,14 +50,24 @@ setup(
         "scikit-learn==1.4.1",  # 机器学习
         # 文件支持
         "openpyxl>=3.1.2",      # Excel 支持
-        "pyarrow>=15.0.0",      # Parquet 支持
+        "pyarrow>=15.0.0",      # Parquet 支持、文档缓存序列化
+        "lmdb>=1.4.1",          # 文档缓存
+        "jmespath>=1.0.1",      # JSON 文档字段查询
         # 环境配置
         "python-dotenv>=1.0.0", # 环境变量
         # AI 对话
         "langchain>=0.1.0",     # 对话框架
         "langchain-openai==0.3.18", # OpenAI 集成
+        "httpx[http2]>=0.27.0", # HTTP/2 连接复用
     ],
     extras_require={
+        "speedups": [
+            "numba>=0.59.0",    # 语义缓存相似度计算 JIT 加速
+            "orjson>=3.9.0",    # JSON 文档快速解析
+        ],
+        "local": [
+            "sentence-transformers>=2.7.0", # 知识库本地嵌入模型
+        ],
         "dev": [
             # 代码质量
             "black==24.2.0",    # 代码格式化
@@ -1,8 +1,11 @@
-from typing import Optional, List
+from typing import ClassVar, Dict, Iterator, Optional, List, Tuple
+import threading
 from ..models.chat_model import ChatModel
 from .memory import ConversationMemory
+from .batcher import Batcher
+from .cache import ResponseCache
 from ..utils.logger import setup_logger
-from langchain.schema import BaseMessage, SystemMessage, HumanMessage
+from langchain.schema import AIMessage, BaseMessage, SystemMessage, HumanMessage
 from ..config import Config
 
 logger = setup_logger(__name__)
@@ -10,12 +13,127 @@ logger = setup_logger(__name__)
 class ChatAgent:
     """对话代理类"""
     
-    def __init__(self):
-        """初始化对话代理"""
+    # 所有实例共享的批处理器，首次使用时创建；共享异步 HTTP 客户端的连接绑定在事件循环上，
+    # 因此整个进程只能有一个批处理器（一个后台事件循环）
+    _shared_batcher: ClassVar[Optional[Batcher]] = None
+    _batcher_lock: ClassVar[threading.Lock] = threading.Lock()
+    # 所有实例共享的回复缓存，按持久化路径区分；各实例各自加载、各自保存会互相覆盖对方写入的条目
+    _shared_caches: ClassVar[Dict[Optional[str], ResponseCache]] = {}
+    _caches_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    def __init__(self, session_id: str = "default"):
+        """
+        初始化对话代理
+        
+        Args:
+            session_id: 会话 ID，用于区分并持久化不同会话的对话历史
+        """
         self.model = ChatModel()
-        self.memory = ConversationMemory()
+        self.memory = ConversationMemory(session_id=session_id)
         self.system_message = SystemMessage(content=Config.SYSTEM_PROMPT)
-        logger.info("初始化对话代理")
+        self._system_prefix = (self.system_message,)  # 固定的消息前缀，每轮直接拼接
+        # 并发调用 chat 时，由批处理器合并为一次批量请求
+        self.batcher = self._get_batcher(self.model)
+        self.cache = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            self.cache = self._get_cache(Config.RESPONSE_CACHE_PATH)
+        logger.debug("初始化对话代理")
+    
+    @classmethod
+    def _get_batcher(cls, model: ChatModel) -> Batcher:
+        """
+        获取共享的批处理器
+        各 ChatModel 实例共用同一个 ChatOpenAI 对象，用任一实例的 achat_batch 作为处理函数即可
+        
+        Args:
+            model: 聊天模型
+        
+        Returns:
+            Batcher: 共享的批处理器
+        """
+        with cls._batcher_lock:
+            if cls._shared_batcher is None:
+                cls._shared_batcher = Batcher(model.achat_batch)
+            return cls._shared_batcher
+    
+    @classmethod
+    def _get_cache(cls, path: Optional[str]) -> ResponseCache:
+        """
+        获取共享的回复缓存，同一路径只创建一个实例
+        
+        Args:
+            path: 持久化文件路径，为 None 时只缓存在内存中
+        
+        Returns:
+            ResponseCache: 共享的回复缓存
+        """
+        with cls._caches_lock:
+            cache = cls._shared_caches.get(path)
+            if cache is None:
+                cache = cls._shared_caches[path] = ResponseCache(
+                    path=path,
+                    semantic=Config.RESPONSE_CACHE_SEMANTIC,
+                    threshold=Config.RESPONSE_CACHE_THRESHOLD,
+                    max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES
+                )
+            return cache
+    
+    def _lookup_cache(self,
+                      messages: List[BaseMessage],
+                      history_messages: Tuple[BaseMessage, ...]) -> Tuple[Optional[Tuple[str, str]], Optional[tuple]]:
+        """
+        查找回复缓存
+        
+        Args:
+            messages: 本轮 LangChain 消息列表
+            history_messages: 历史消息
+        
+        Returns:
+            Tuple: (命中的 (回复, 思考过程) 或 None, 未命中时写回缓存所需的 (key, context, embedding))
+        """
+        if not self.cache:
+            return None, None
+        
+        user_content = "\n".join(msg.content for msg in messages)
+        context = ResponseCache.make_key(
+            self.system_message.content,
+            "\n".join(msg.content for msg in history_messages)
+        )
+        key = ResponseCache.make_key(context, user_content)
+        embedding = None
+        cached = self.cache.get(key, context)
+        if cached is None:
+            # 精确匹配未命中时才计算嵌入向量做语义匹配
+            embedding = self.cache.embed(user_content)
+            cached = self.cache.get(key, context, embedding)
+        if cached is not None:
+            logger.info("命中回复缓存")
+        return cached, (key, context, embedding)
+    
+    def _build_messages(self,
+                        history_messages: Tuple[BaseMessage, ...],
+                        messages: List[BaseMessage]) -> Tuple[BaseMessage, ...]:
+        """
+        合并系统消息、历史消息和当前消息
+        
+        Args:
+            history_messages: 历史消息
+            messages: 本轮 LangChain 消息列表
+        
+        Returns:
+            Tuple[BaseMessage, ...]: 发送给模型的完整消息序列
+        """
+        if not history_messages:
+            # 首轮对话没有历史，省去一次元组拼接
+            return (self.system_message, *messages)
+        return self._system_prefix + history_messages + tuple(messages)
+    
+    def _remember(self, messages: List[BaseMessage], response: str) -> None:
+        """将用户消息和 AI 回复添加到历史记录"""
+        for msg in messages:
+            if isinstance(msg, HumanMessage):
+                self.memory.add_message(msg)
+        self.memory.add_message(AIMessage(content=response))
     
     def chat(self, messages: List[BaseMessage]) -> tuple[str, str]:
         """
@@ -28,44 +146,68 @@ class ChatAgent:
             tuple[str, str]: (AI 的回复, 思考过程)
         """
         try:
-            # 获取历史消息
-            history = self.memory.get_messages()
-            
-            # 将历史消息转换为 LangChain 消息格式
-            history_messages = []
-            for msg in history:
-                if msg["role"] == "user":
-                    history_messages.append(HumanMessage(content=msg["content"]))
-                else:
-                    history_messages.append(SystemMessage(content=msg["content"]))
-            
-            # 确保不超过最大历史记录数
-            # 每个对话轮次包含用户消息和助手回复，所以实际轮次是消息数的一半
-            max_rounds = Config.MAX_HISTORY // 2
-            if len(history_messages) > max_rounds * 2:
-                # 保留最近的对话轮次
-                history_messages = history_messages[-(max_rounds * 2):]
-                logger.info(f"历史消息超过最大轮次限制，保留最近 {max_rounds} 轮对话")
+            # 获取历史消息（已是 LangChain 消息，条数由记忆队列的 maxlen 限制）
+            history_messages = tuple(self.memory.messages)
             
             # 合并系统消息、历史消息和当前消息
-            all_messages = [self.system_message] + history_messages + messages
+            all_messages = self._build_messages(history_messages, messages)
             
-            # 获取 AI 回复和思考过程
-            response, thinking = self.model.chat(all_messages)
+            # 先查回复缓存，命中时跳过模型调用
+            cached, cache_args = self._lookup_cache(messages, history_messages)
+            if cached is not None:
+                response, thinking = cached
+            else:
+                # 获取 AI 回复和思考过程
+                future = self.batcher.submit(all_messages)
+                response, thinking = future.result()
+                if cache_args:
+                    self.cache.put(*cache_args, (response, thinking))
             
             # 添加用户消息和 AI 回复到历史记录
-            for msg in messages:
-                if isinstance(msg, HumanMessage):
-                    self.memory.add_message("user", msg.content)
-            self.memory.add_message("assistant", response)
+            self._remember(messages, response)
             
             return response, thinking
             
         except Exception as e:
-            logger.error(f"对话处理出错: {str(e)}")
+            logger.error("对话处理出错: %s", e)
+            raise
+    
+    def chat_stream(self, messages: List[BaseMessage]) -> Iterator[str]:
+        """
+        流式处理用户输入，逐段返回模型输出
+        输出包含思考过程和最终答案；生成结束后只把最终答案写入历史记录
+        
+        Args:
+            messages: LangChain 消息列表
+        
+        Yields:
+            str: 模型输出的文本片段（命中缓存时一次性返回缓存的回复）
+        """
+        try:
+            history_messages = tuple(self.memory.messages)
+            all_messages = self._build_messages(history_messages, messages)
+            
+            cached, cache_args = self._lookup_cache(messages, history_messages)
+            if cached is not None:
+                response, thinking = cached
+                yield response
+            else:
+                # 边输出边累积，生成结束后再分离思考过程和最终答案
+                chunks = []
+                for chunk in self.model.chat_stream(all_messages):
+                    chunks.append(chunk)
+                    yield chunk
+                response, thinking = ChatModel.split_thinking("".join(chunks))
+                if cache_args:
+                    self.cache.put(*cache_args, (response, thinking))
+            
+            self._remember(messages, response)
+        
+        except Exception as e:
+            logger.error("流式对话处理出错: %s", e)
             raise
     
     def clear_history(self) -> None:
         """清空对话历史"""
         self.memory.clear()
-        logger.info("清空对话历史") 
\ No newline at end of file
+        logger.debug("清空对话历史") 
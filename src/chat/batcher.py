@@ -0,0 +1,91 @@
+"""
+请求微批处理模块
+将短时间窗口内并发提交的对话请求合并成一批，一次性交给模型并发处理，主要功能：
+- 使用队列收集并发提交的请求
+- 达到批大小上限或等待超时后统一发送
+- 通过 Future 将每条结果返回给对应的调用方
+"""
+from typing import Any, Awaitable, Callable, List, Tuple
+from concurrent.futures import Future
+import asyncio
+import queue
+import threading
+import time
+from ..config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class Batcher:
+    """
+    微批处理器
+    后台线程持有一个事件循环，把收集到的请求批量交给异步处理函数
+    """
+    
+    def __init__(self,
+                 handler: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch: int = Config.BATCH_MAX_SIZE,
+                 max_wait_ms: float = Config.BATCH_MAX_WAIT_MS):
+        """
+        初始化微批处理器
+        
+        Args:
+            handler: 批处理函数（协程函数），输入请求列表，返回等长的结果列表；
+                     结果为异常对象时，只有对应的请求以该异常结束
+            max_batch: 单批最大请求数
+            max_wait_ms: 收到第一条请求后最长等待时间（毫秒）
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="chat-batcher", daemon=True)
+        self._worker.start()
+    
+    def submit(self, item: Any) -> Future:
+        """
+        提交一条请求
+        
+        Args:
+            item: 请求内容（如一次对话的消息列表）
+        
+        Returns:
+            Future: 完成后 result() 返回该请求的处理结果
+        """
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+    
+    def _collect(self) -> List[Tuple[Any, Future]]:
+        """阻塞等待第一条请求，然后在等待窗口内尽量凑满一批"""
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return pending
+    
+    def _run(self) -> None:
+        """后台线程主循环"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            pending = self._collect()
+            items = [item for item, _ in pending]
+            logger.debug("发送批量请求: %s 条", len(items))
+            try:
+                results = loop.run_until_complete(self.handler(items))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,255 @@
+"""
+对话回复缓存模块
+负责缓存模型回复，命中时跳过模型调用，主要功能：
+- 按 (系统提示, 历史消息, 用户输入) 做精确匹配
+- 可选地按用户输入的嵌入向量做语义相似度匹配
+- 缓存持久化到磁盘，重启后仍可命中
+- 按最近最少使用淘汰，条目数不超过上限
+"""
+from typing import Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import numpy as np
+from ..config import Config
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _numpy_scores(embeddings: np.ndarray,
+                  query: np.ndarray,
+                  norms: np.ndarray,
+                  q_norm: float) -> np.ndarray:
+    """用 NumPy 计算每条缓存向量与查询向量的余弦相似度"""
+    return embeddings @ query / (norms * q_norm + 1e-9)
+
+# 余弦相似度计算函数，首次语义查询时才选择实现并编译
+_cosine_scores = None
+
+def _get_cosine_scores():
+    """
+    获取余弦相似度计算函数
+    安装了 numba 时在首次调用时 JIT 编译并行实现，否则使用 NumPy 实现；
+    语义层默认关闭，延迟到这里编译可避免导入模块时承担编译开销
+    
+    Returns:
+        Callable: (embeddings, query, norms, q_norm) -> 相似度数组
+    """
+    global _cosine_scores
+    if _cosine_scores is not None:
+        return _cosine_scores
+    try:
+        from numba import njit, prange
+    except ImportError:  # 未安装 numba 时使用 NumPy 实现
+        _cosine_scores = _numpy_scores
+        return _cosine_scores
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _numba_scores(embeddings, query, norms, q_norm):
+        """并行计算每条缓存向量与查询向量的余弦相似度"""
+        scores = np.empty(embeddings.shape[0], dtype=np.float32)
+        for i in prange(embeddings.shape[0]):
+            s = 0.0
+            for d in range(embeddings.shape[1]):
+                s += embeddings[i, d] * query[d]
+            scores[i] = s / (norms[i] * q_norm + 1e-9)
+        return scores
+    
+    _numba_scores(np.zeros((1, 4), dtype=np.float32), np.zeros(4, dtype=np.float32),
+                  np.ones(1, dtype=np.float32), 1.0)
+    _cosine_scores = _numba_scores
+    return _cosine_scores
+    
+def _best_match(embeddings: np.ndarray,
+                query: np.ndarray,
+                norms: np.ndarray,
+                q_norm: float) -> Tuple[int, float]:
+    """返回相似度最高的缓存条目下标及其相似度"""
+    scores = _get_cosine_scores()(embeddings, query, norms, q_norm)
+    best = int(np.argmax(scores))
+    return best, float(scores[best])
+
+class ResponseCache:
+    """
+    对话回复缓存
+    先按缓存键做精确匹配；启用语义层时，再在相同上下文的缓存条目中
+    按用户输入的嵌入向量查找余弦相似度超过阈值的回复
+    """
+    
+    # 持久化格式版本，语义层的结构变化时递增
+    _FORMAT_VERSION = 2
+    
+    def __init__(self,
+                 path: Optional[Union[str, Path]] = None,
+                 semantic: bool = False,
+                 threshold: float = 0.95,
+                 max_entries: int = 1000):
+        """
+        初始化回复缓存
+        
+        Args:
+            path: 持久化文件路径，为 None 时只缓存在内存中
+            semantic: 是否启用语义相似度匹配
+            threshold: 语义命中的最小余弦相似度
+            max_entries: 最多缓存的回复条数，超出时淘汰最久未使用的条目
+        """
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # 精确匹配层，按使用顺序排列（最久未使用的在最前）
+        self.exact: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        # 语义层：上下文哈希 -> (嵌入向量矩阵, 向量模长, 回复列表, 缓存键列表)
+        self.semantic: Dict[str, Tuple[np.ndarray, np.ndarray, List[Tuple[str, str]], List[str]]] = {}
+        # 带嵌入向量的缓存键 -> 上下文哈希，淘汰时据此删除语义层中对应的行
+        self._contexts: Dict[str, str] = {}
+        # 多个线程共用同一实例时，保护缓存的读写和持久化
+        self._lock = threading.Lock()
+        self.embedder = None
+        if semantic:
+            from langchain_openai import OpenAIEmbeddings
+            self.embedder = OpenAIEmbeddings(api_key=Config.API_KEY, base_url=Config.API_BASE)
+            # 启用语义层时提前编译相似度计算，避免首次查询承担编译开销
+            _get_cosine_scores()
+        self._load()
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        计算缓存键
+        
+        Args:
+            parts: 参与计算的文本片段
+        
+        Returns:
+            str: blake2b 十六进制摘要
+        """
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8")).hexdigest()
+    
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """计算文本的嵌入向量，未启用语义层时返回 None"""
+        if self.embedder is None:
+            return None
+        return np.asarray(self.embedder.embed_query(text), dtype=np.float32)
+    
+    def get(self,
+            key: str,
+            context: str,
+            embedding: Optional[np.ndarray] = None) -> Optional[Tuple[str, str]]:
+        """
+        查找缓存的回复
+        
+        Args:
+            key: 精确匹配的缓存键
+            context: 上下文哈希，语义匹配只在相同上下文中进行
+            embedding: 用户输入的嵌入向量
+        
+        Returns:
+            Optional[Tuple[str, str]]: (回复, 思考过程)，未命中时返回 None
+        """
+        with self._lock:
+            hit = self.exact.get(key)
+            if hit is not None:
+                self.exact.move_to_end(key)
+                return hit
+            if embedding is None or context not in self.semantic:
+                return None
+        
+            embeddings, norms, responses, keys = self.semantic[context]
+            best, score = _best_match(embeddings, embedding, norms, float(np.linalg.norm(embedding)))
+            if score <= self.threshold:
+                return None
+            self.exact.move_to_end(keys[best])
+            return responses[best]
+    
+    def put(self,
+            key: str,
+            context: str,
+            embedding: Optional[np.ndarray],
+            response: Tuple[str, str]) -> None:
+        """
+        写入缓存并持久化
+        
+        Args:
+            key: 精确匹配的缓存键
+            context: 上下文哈希
+            embedding: 用户输入的嵌入向量
+            response: (回复, 思考过程)
+        """
+        with self._lock:
+            if key in self.exact:
+                self._evict(key)
+            self.exact[key] = response
+            if embedding is not None:
+                norm = np.array([np.linalg.norm(embedding)], dtype=np.float32)
+                if context in self.semantic:
+                    embeddings, norms, responses, keys = self.semantic[context]
+                    self.semantic[context] = (np.vstack([embeddings, embedding]),
+                                              np.concatenate([norms, norm]),
+                                              responses + [response],
+                                              keys + [key])
+                else:
+                    self.semantic[context] = (embedding[None, :], norm, [response], [key])
+                self._contexts[key] = context
+            while len(self.exact) > self.max_entries:
+                self._evict(next(iter(self.exact)))
+            self._save()
+    
+    def _evict(self, key: str) -> None:
+        """删除一个缓存条目，包括语义层中对应的行"""
+        del self.exact[key]
+        context = self._contexts.pop(key, None)
+        if context is None:
+            return
+        embeddings, norms, responses, keys = self.semantic[context]
+        if len(keys) == 1:
+            del self.semantic[context]
+            return
+        i = keys.index(key)
+        self.semantic[context] = (np.delete(embeddings, i, axis=0),
+                                  np.delete(norms, i),
+                                  responses[:i] + responses[i + 1:],
+                                  keys[:i] + keys[i + 1:])
+    
+    def _load(self) -> None:
+        """从磁盘加载缓存"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+            self.exact = OrderedDict(state["exact"])
+            # 旧格式的语义层没有记录缓存键，无法参与淘汰，直接丢弃
+            if self.embedder is not None and state.get("version") == self._FORMAT_VERSION:
+                self.semantic = state.get("semantic", {})
+                self._contexts = {key: context
+                                  for context, (_, _, _, keys) in self.semantic.items()
+                                  for key in keys}
+            while len(self.exact) > self.max_entries:
+                self._evict(next(iter(self.exact)))
+            logger.info("加载回复缓存: %s 条", len(self.exact))
+        except Exception as e:
+            logger.error("加载回复缓存失败: %s", e)
+    
+    def _save(self) -> None:
+        """
+        将缓存写入磁盘，调用方需持有 self._lock
+        先写入同目录下唯一命名的临时文件再原子替换，并发保存互不干扰，写到一半崩溃也不会损坏已有缓存
+        """
+        if not self.path:
+            return
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".", suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({"version": self._FORMAT_VERSION, "exact": self.exact, "semantic": self.semantic},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error("保存回复缓存失败: %s", e)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
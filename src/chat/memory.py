@@ -1,58 +1,126 @@
 """
 对话记忆管理模块
 负责存储和管理对话历史记录，主要功能：
-- 使用固定大小的队列存储历史消息
+- 使用固定大小的队列直接存储 LangChain 消息对象
+- 按会话将消息持久化到 SQLite（WAL 模式），重启后可恢复
 - 提供消息的添加和获取接口
 - 自动管理历史记录大小
 """
-from typing import List, Dict, Any
+from typing import List, Optional, Union
 from collections import deque
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from ..config import Config
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 消息类型与 LangChain 消息类的对应关系，用于从数据库还原消息
+_MESSAGE_TYPES = {
+    "human": HumanMessage,
+    "ai": AIMessage,
+    "system": SystemMessage,
+}
+
 class ConversationMemory:
     """
     对话记忆管理类
-    使用双端队列（deque）实现固定大小的历史记录存储
+    使用双端队列（deque）实现固定大小的历史记录存储，
+    消息以 LangChain 消息对象保存，取用时无需再做格式转换；
+    同时将每条消息追加写入 SQLite，按会话 ID 区分不同对话
     """
     
-    def __init__(self, max_history: int = Config.MAX_HISTORY):
+    _INSERT_SQL = "INSERT INTO msgs(session, ts, role, content) VALUES (?, ?, ?, ?)"
+    
+    def __init__(self,
+                 max_history: int = Config.MAX_HISTORY,
+                 session_id: str = "default",
+                 db_path: Optional[Union[str, Path]] = Config.MEMORY_DB_PATH):
         """
         初始化对话记忆
         
         Args:
             max_history: 最大历史记录数，默认为配置中的值
+            session_id: 会话 ID，同一会话的历史记录会在重启后恢复
+            db_path: SQLite 数据库路径，为 None 时只保存在内存中
         """
         self.max_history = max_history
-        self.messages = deque(maxlen=max_history)  # 使用固定大小的双端队列
-        logger.info(f"初始化对话记忆，最大历史记录数: {max_history}")
+        self.session_id = session_id
+        self.messages: deque[BaseMessage] = deque(maxlen=max_history)  # 使用固定大小的双端队列
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            try:
+                self._conn = self._connect(Path(db_path))
+                self.messages.extend(self._load_recent())
+            except (OSError, sqlite3.Error) as e:
+                # 目录只读或数据库损坏时不影响对话，退回只在内存中保存
+                logger.warning("无法打开对话历史数据库 %s，历史记录只保存在内存中: %s", db_path, e)
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        logger.info("初始化对话记忆，会话: %s，最大历史记录数: %s", session_id, max_history)
+    
+    @staticmethod
+    def _connect(db_path: Path) -> sqlite3.Connection:
+        """
+        打开数据库连接并建表
+        
+        Args:
+            db_path: 数据库文件路径
+        
+        Returns:
+            sqlite3.Connection: 自动提交模式的数据库连接
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None 为自动提交模式，每次 INSERT 即一次追加写入
+        conn = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS msgs(session TEXT, ts REAL, role TEXT, content TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_msgs_session_ts ON msgs(session, ts)")
+        return conn
+    
+    def _load_recent(self) -> List[BaseMessage]:
+        """从数据库读取当前会话最近的 max_history 条消息（按时间正序）"""
+        rows = self._conn.execute(
+            "SELECT role, content FROM msgs WHERE session=? ORDER BY ts DESC, rowid DESC LIMIT ?",
+            (self.session_id, self.max_history)
+        ).fetchall()
+        return [_MESSAGE_TYPES.get(role, HumanMessage)(content=content) for role, content in reversed(rows)]
     
-    def add_message(self, role: str, content: str) -> None:
+    def add_message(self, message: BaseMessage) -> None:
         """
         添加消息到历史记录
         
         Args:
-            role: 消息角色（user/assistant）
-            content: 消息内容
+            message: LangChain 消息（HumanMessage/AIMessage）
         """
-        self.messages.append({"role": role, "content": content})
-        logger.debug(f"添加消息: {role} - {content[:50]}...")  # 只记录前50个字符
+        self.messages.append(message)
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(self._INSERT_SQL, (self.session_id, time.time(), message.type, message.content))
+        logger.debug("添加消息: %s - %s...", message.type, message.content[:50])  # 只记录前50个字符
     
-    def get_messages(self) -> List[Dict[str, str]]:
+    def get_messages(self) -> List[BaseMessage]:
         """
         获取所有历史消息
         
         Returns:
-            List[Dict[str, str]]: 消息列表，每个消息包含role和content
+            List[BaseMessage]: 按时间顺序排列的 LangChain 消息列表
         """
         return list(self.messages)
     
     def clear(self) -> None:
         """
         清空历史记录
-        移除所有已存储的消息
+        移除当前会话所有已存储的消息
         """
         self.messages.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("DELETE FROM msgs WHERE session=?", (self.session_id,))
         logger.info("清空对话历史记录") 
\ No newline at end of file
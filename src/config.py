@@ -6,19 +6,36 @@
 - 对话配置
 - 日志配置
 """
-from typing import Dict, Any
-from pathlib import Path
+from typing import Any, Mapping
+from types import MappingProxyType
+import functools
+import logging
 import os
-from dotenv import load_dotenv
+
+# 项目根目录，解析一次后以字符串形式缓存，路径拼接统一使用 os.path
+BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 用户级缓存目录，存放对话历史和回复缓存；作为 aichat 命令安装后 BASE_DIR 位于 site-packages，
+# 可能只读，因此不写入项目目录。可通过环境变量 AICHAT_CACHE_DIR 指定
+CACHE_DIR: str = os.getenv("AICHAT_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "aichat"
+)
 
 # 加载环境变量文件
-load_dotenv()
+# 环境变量已提供密钥时（如 CI、容器部署）跳过，否则直接读取项目根目录下的 .env，
+# 避免 load_dotenv() 默认的逐级向上查找
+if not os.environ.get("AIHUBMIX_API_KEY"):
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=os.path.join(BASE_DIR, ".env"), override=False)
+
+logger = logging.getLogger(__name__)
 
 class Config:
     """项目配置类，集中管理所有配置项"""
     
     # 基础配置
-    BASE_DIR: Path = Path(__file__).parent.parent  # 项目根目录
+    BASE_DIR: str = BASE_DIR  # 项目根目录
+    CACHE_DIR: str = CACHE_DIR  # 用户级缓存目录
     API_KEY: str = os.getenv("AIHUBMIX_API_KEY", "")  # API密钥
     API_BASE: str = "https://aihubmix.com/v1"  # API基础URL
     
@@ -27,27 +44,46 @@ class Config:
     TEMPERATURE: float = 0.7  # 温度参数，控制输出的随机性
     MAX_TOKENS: int = 2000  # 最大输出token数
     
+    # HTTP 连接配置
+    HTTP_TIMEOUT: float = 60.0  # 请求超时时间（秒）
+    HTTP_MAX_CONNECTIONS: int = 100  # 连接池最大连接数
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50  # 最大保持活跃的连接数
+    
     # 对话配置
     SYSTEM_PROMPT: str = "你是一个有帮助的AI助手。"  # 系统提示词
     MAX_HISTORY: int = 10  # 最大历史记录数（对话轮次 * 2）
+    MEMORY_DB_PATH: str = os.path.join(CACHE_DIR, "memory.sqlite3")  # 对话历史持久化数据库
+    
+    # 回复缓存配置
+    RESPONSE_CACHE_ENABLED: bool = True  # 是否启用回复缓存
+    RESPONSE_CACHE_SEMANTIC: bool = False  # 是否启用语义相似度匹配（需额外调用嵌入接口）
+    RESPONSE_CACHE_THRESHOLD: float = 0.95  # 语义命中的最小余弦相似度
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000  # 最多缓存的回复条数，超出时淘汰最久未使用的条目
+    RESPONSE_CACHE_PATH: str = os.path.join(CACHE_DIR, "responses.pkl")  # 缓存持久化文件
+    
+    # 批处理配置
+    BATCH_MAX_SIZE: int = 32  # 单批最大请求数
+    BATCH_MAX_WAIT_MS: float = 10  # 凑批最长等待时间（毫秒）
     
     # 日志配置
-    LOG_LEVEL: str = "INFO"  # 日志级别
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "WARNING").upper()  # 日志级别，可通过环境变量 LOG_LEVEL 覆盖
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"  # 日志格式
     
     @classmethod
-    def get_model_config(cls) -> Dict[str, Any]:
+    @functools.lru_cache(maxsize=1)
+    def get_model_config(cls) -> Mapping[str, Any]:
         """
         获取模型配置
+        结果只构建一次并缓存，返回只读视图，防止调用方意外修改共享配置
         
         Returns:
-            Dict[str, Any]: 包含模型参数的字典
+            Mapping[str, Any]: 包含模型参数的只读映射
         """
-        return {
+        return MappingProxyType({
             "model": cls.DEFAULT_MODEL,
             "temperature": cls.TEMPERATURE,
             "max_tokens": cls.MAX_TOKENS,
-        }
+        })
     
     @classmethod
     def validate_config(cls) -> None:
@@ -58,8 +94,6 @@ class Config:
         Raises:
             ValueError: 当配置无效时抛出异常
         """
-        print(f"正在验证配置...")
-        print(f"API_KEY 长度: {len(cls.API_KEY) if cls.API_KEY else 0}")
         if not cls.API_KEY:
             raise ValueError("请在 .env 文件中设置 AIHUBMIX_API_KEY")
-        print("配置验证通过！") 
\ No newline at end of file
+        logger.info("配置验证通过，API_KEY 长度: %s", len(cls.API_KEY)) 
@@ -1,8 +1,23 @@
 """
 Data loading and processing module.
 """
+from typing import TYPE_CHECKING
 
-from .loader import DataLoader
-from .processor import DataProcessor
+# Submodules pull in heavy dependencies (LangChain, sklearn), so they are
+# imported on first attribute access rather than with the package.
+if TYPE_CHECKING:
+    from .loader import DataLoader
+    from .processor import DataProcessor
 
-__all__ = ['DataLoader', 'DataProcessor'] 
\ No newline at end of file
+_EXPORTS = {
+    'DataLoader': '.loader',
+    'DataProcessor': '.processor',
+}
+
+__all__ = ['DataLoader', 'DataProcessor']
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
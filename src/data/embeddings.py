@@ -0,0 +1,78 @@
+"""
+本地文本嵌入模块
+使用 sentence-transformers 在本地计算文本嵌入，主要功能：
+- 按批次编码文本，不再逐块调用远程嵌入接口
+- 嵌入向量归一化为单位长度，余弦相似度即为内积
+"""
+from typing import List, Optional
+import logging
+
+from langchain_core.embeddings import Embeddings
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # 未安装 sentence-transformers 时，创建 LocalEmbeddings 会报错
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# 默认的本地嵌入模型
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+class LocalEmbeddings(Embeddings):
+    """
+    基于 sentence-transformers 的本地嵌入模型
+    与 LangChain 的 Embeddings 接口兼容，可直接传给 Chroma 等向量数据库
+    """
+    
+    def __init__(self,
+                 model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 batch_size: int = 64,
+                 device: Optional[str] = None):
+        """
+        初始化本地嵌入模型
+        
+        Args:
+            model_name: sentence-transformers 模型名称或本地路径
+            batch_size: 每批编码的文本数
+            device: 运行设备，为 None 时有 CUDA 则用 CUDA，否则用 CPU
+        """
+        if SentenceTransformer is None:
+            raise ImportError("本地嵌入需要安装 sentence-transformers：pip install .[local]")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device=device)
+        logger.info("加载本地嵌入模型: %s，设备: %s", model_name, self.model.device)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量计算文档嵌入
+        
+        Args:
+            texts: 文本列表
+        
+        Returns:
+            List[List[float]]: 归一化的嵌入向量列表
+        """
+        if not texts:
+            return []
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return embeddings.tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        计算查询嵌入
+        
+        Args:
+            text: 查询文本
+        
+        Returns:
+            List[float]: 嵌入向量
+        """
+        return self.embed_documents([text])[0]
@@ -0,0 +1,114 @@
+"""
+JSON 文档加载器模块
+提供基于 orjson 的快速 JSON 加载器，主要功能：
+- 以字节读取文件，用 orjson 解析（未安装时回退到标准库 json）
+- 用 JMESPath 表达式选取需要的字段，不依赖 jq
+- 支持 JSON Lines 格式
+"""
+from typing import Any, Iterator, List, Optional, Union
+from pathlib import Path
+import json
+import re
+
+import jmespath
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库 json
+    orjson = None
+
+# 可直接改写为 JMESPath 的简单 jq 路径，如 ".", ".[]", ".messages[].content"
+_SIMPLE_JQ_RE = re.compile(r"\.|(\.[A-Za-z_]\w*|\.?\[\])+")
+
+def _loads(data: Union[bytes, str]) -> Any:
+    """解析 JSON 文本"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dumps(value: Any) -> str:
+    """将非字符串内容序列化为 JSON 文本"""
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False)
+
+def _jq_to_jmespath(jq_schema: str) -> Optional[str]:
+    """
+    将简单的 jq 路径改写为 JMESPath 表达式
+    
+    Args:
+        jq_schema: jq 路径，只支持字段访问和 [] 展开
+    
+    Returns:
+        Optional[str]: JMESPath 表达式，"." 对应 None（整个文档）
+    """
+    if not _SIMPLE_JQ_RE.fullmatch(jq_schema):
+        raise ValueError(f"只支持简单的 jq 路径（如 .messages[].content），复杂查询请改用 query 参数: {jq_schema}")
+    if jq_schema == ".":
+        return None
+    return jq_schema[1:].replace(".[", "[") if jq_schema.startswith(".") else jq_schema
+
+class FastJSONLoader(BaseLoader):
+    """
+    快速 JSON 文档加载器
+    查询结果为列表时每个元素生成一个文档，否则整个结果生成一个文档；
+    字符串内容原样作为文档文本，其他类型序列化为 JSON 文本
+    """
+    
+    def __init__(self,
+                 file_path: Union[str, Path],
+                 query: Optional[str] = None,
+                 jq_schema: Optional[str] = None,
+                 content_key: Optional[str] = None,
+                 json_lines: bool = False):
+        """
+        初始化 JSON 加载器
+        
+        Args:
+            file_path: 文件路径
+            query: JMESPath 查询表达式，为 None 时使用整个文档
+            jq_schema: 兼容 JSONLoader 的 jq 路径，只支持简单路径，会改写为 JMESPath
+            content_key: 从每个结果元素中取出该字段作为文档文本
+            json_lines: 文件是否为 JSON Lines 格式（每行一个 JSON 值）
+        """
+        self.file_path = Path(file_path)
+        if query is None and jq_schema is not None:
+            query = _jq_to_jmespath(jq_schema)
+        self._query = jmespath.compile(query) if query else None
+        self.content_key = content_key
+        self.json_lines = json_lines
+    
+    def _select(self, data: Any) -> List[Any]:
+        """按查询表达式选取结果，并展开为元素列表"""
+        if self._query is not None:
+            data = self._query.search(data)
+        if data is None:
+            return []
+        return data if isinstance(data, list) else [data]
+    
+    def lazy_load(self) -> Iterator[Document]:
+        """
+        逐个生成文档
+        
+        Yields:
+            Document: 每个查询结果元素对应的文档
+        """
+        raw = self.file_path.read_bytes()
+        if self.json_lines:
+            values = [_loads(line) for line in raw.splitlines() if line.strip()]
+        else:
+            values = [_loads(raw)]
+        
+        source = str(self.file_path)
+        seq_num = 0
+        for value in values:
+            for item in self._select(value):
+                if self.content_key is not None:
+                    item = item.get(self.content_key) if isinstance(item, dict) else None
+                    if item is None:
+                        continue
+                seq_num += 1
+                yield Document(
+                    page_content=item if isinstance(item, str) else _dumps(item),
+                    metadata={'source': source, 'seq_num': seq_num}
+                )
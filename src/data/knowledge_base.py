@@ -10,8 +10,6 @@ import json
 import os
 
 from langchain.schema import Document
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
 
 from .loader import DataLoader
 
@@ -33,7 +31,8 @@ class KnowledgeBase:
                  cache_dir: Optional[str] = None,
                  metadata_file: Optional[str] = None,
                  api_key: Optional[str] = None,
-                 base_url: Optional[str] = None):
+                 base_url: Optional[str] = None,
+                 embedding_model: Optional[str] = None):
         """
         初始化知识库
         
@@ -43,6 +42,8 @@ class KnowledgeBase:
             metadata_file: 元数据文件路径
             api_key: OpenAI API密钥或AiHubMix API密钥
             base_url: API基础URL，用于自定义API端点
+            embedding_model: 本地嵌入模型名称（需安装 .[local]），为 None 时使用远程嵌入接口；
+                             不同模型的向量维度不同，同一向量数据库必须始终使用同一个模型
         """
         self.persist_dir = Path(persist_dir)
         self.cache_dir = Path(cache_dir) if cache_dir else None
@@ -57,12 +58,20 @@ class KnowledgeBase:
         self.api_key = api_key or os.environ.get("AIHUBMIX_API_KEY") or os.environ.get("OPENAI_API_KEY")
         self.base_url = base_url or os.environ.get("OPENAI_BASE_URL") or "https://aihubmix.com/v1"
             
+        # 初始化嵌入模型：显式指定本地模型时在本地批量计算，省去每个文本块一次的网络请求；
+        # 未安装 sentence-transformers 时直接报错，不静默换用维度不同的远程嵌入
+        embeddings = None
+        if embedding_model:
+            from .embeddings import LocalEmbeddings
+            embeddings = LocalEmbeddings(embedding_model)
+        
         # 初始化数据加载器
         self.loader = DataLoader(
             cache_dir=str(self.cache_dir) if self.cache_dir else None,
             persist_dir=str(self.persist_dir),
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            embeddings=embeddings
         )
         
         # 初始化元数据
@@ -75,7 +84,7 @@ class KnowledgeBase:
                 with open(self.metadata_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except Exception as e:
-                logger.error(f"加载元数据失败: {str(e)}")
+                logger.error("加载元数据失败: %s", e)
                 return {}
         return {}
         
@@ -86,7 +95,7 @@ class KnowledgeBase:
                 with open(self.metadata_file, 'w', encoding='utf-8') as f:
                     json.dump(self.metadata, f, ensure_ascii=False, indent=2)
             except Exception as e:
-                logger.error(f"保存元数据失败: {str(e)}")
+                logger.error("保存元数据失败: %s", e)
                 
     def add_document(self, 
                     file_path: str,
@@ -101,18 +110,19 @@ class KnowledgeBase:
         Returns:
             bool: 是否添加成功
         """
-        logger.info(f"开始添加文档: {file_path}")
+        logger.info("开始添加文档: %s", file_path)
         file_path = str(file_path)  # 确保文件路径是字符串类型
         
         try:
             # 打印文件信息
             path_obj = Path(file_path)
-            logger.info(f"文件存在: {path_obj.exists()}, 文件类型: {path_obj.suffix}")
+            logger.info("文件存在: %s, 文件类型: %s", path_obj.exists(), path_obj.suffix)
             
             # 加载文档
-            logger.info(f"正在通过DataLoader加载文件: {file_path}")
+            logger.info("正在通过DataLoader加载文件: %s", file_path)
             docs = self.loader.load(file_path)
-            logger.info(f"文件加载成功，共获取 {len(docs)} 个文本块")
+            self.loader.flush()  # 立即写入向量数据库，添加后即可检索
+            logger.info("文件加载成功，共获取 %s 个文本块", len(docs))
             
             # 更新元数据
             doc_id = str(datetime.now().timestamp())
@@ -124,13 +134,11 @@ class KnowledgeBase:
             }
             self._save_metadata()
             
-            logger.info(f"成功添加文档: {file_path}")
+            logger.info("成功添加文档: %s", file_path)
             return True
             
         except Exception as e:
-            logger.error(f"添加文档失败 {file_path}: {str(e)}")
-            import traceback
-            logger.error(f"错误堆栈: {traceback.format_exc()}")
+            logger.exception("添加文档失败 %s: %s", file_path, e)
             raise  # 向上传递异常，便于调试
             
     def remove_document(self, doc_id: str) -> bool:
@@ -145,7 +153,7 @@ class KnowledgeBase:
         """
         try:
             if doc_id not in self.metadata:
-                logger.warning(f"文档不存在: {doc_id}")
+                logger.warning("文档不存在: %s", doc_id)
                 return False
                 
             # 从向量数据库中删除
@@ -155,11 +163,11 @@ class KnowledgeBase:
             del self.metadata[doc_id]
             self._save_metadata()
             
-            logger.info(f"成功删除文档: {doc_id}")
+            logger.info("成功删除文档: %s", doc_id)
             return True
             
         except Exception as e:
-            logger.error(f"删除文档失败 {doc_id}: {str(e)}")
+            logger.error("删除文档失败 %s: %s", doc_id, e)
             return False
             
     def search(self, 
@@ -180,7 +188,7 @@ class KnowledgeBase:
         try:
             return self.loader.search(query, k=k)
         except Exception as e:
-            logger.error(f"搜索失败: {str(e)}")
+            logger.error("搜索失败: %s", e)
             return []
             
     def get_document_info(self, doc_id: str) -> Optional[Dict[str, Any]]:
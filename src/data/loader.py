@@ -3,31 +3,316 @@
 负责加载和处理各种格式的文档，主要功能：
 - 支持多种文件格式（txt, csv, json, xlsx, pdf, md等）
 - 文本分割和预处理
-- 文档缓存管理
+- 文档缓存管理（LMDB，按文件内容和分割参数寻址，值为 Arrow IPC 格式）
+- 文本块去重（按内容哈希跳过已写入向量数据库的文本块）
+- 异步加载（aload / abatch_load），并发加载多个文件时重叠磁盘读取、文本分割和嵌入请求
 """
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import asyncio
+import contextlib
+import hashlib
+import importlib
+import json
 import logging
-from datetime import datetime
-
-# 导入 LangChain 文档加载器 (更新导入路径以解决弃用警告)
-from langchain_community.document_loaders import (
-    TextLoader,  # 文本文件加载器
-    CSVLoader,  # CSV文件加载器
-    JSONLoader,  # JSON文件加载器
-    UnstructuredExcelLoader,  # Excel文件加载器
-    PyPDFLoader,  # PDF文件加载器
-    UnstructuredMarkdownLoader  # Markdown文件加载器
-)
-from langchain.text_splitter import RecursiveCharacterTextSplitter  # 文本分割器
+import sqlite3
+import struct
+import threading
+import time
+
+import lmdb  # 文档缓存存储
+import pyarrow as pa  # 文档缓存序列化
+
+# LangChain 文档加载器、向量数据库和 OpenAI 嵌入模型导入较慢，推迟到首次使用时再导入
 from langchain.schema import Document  # 文档模型
-from langchain_chroma import Chroma  # 向量数据库
-from langchain_openai import OpenAIEmbeddings  # 文本嵌入模型
+from langchain_core.embeddings import Embeddings  # 嵌入模型接口
+
+from .splitter import RegexTextSplitter  # 文本分割器
 
 # 设置日志记录器
 logger = logging.getLogger(__name__)
 
+# 缓存值头部：最近使用时间戳（小端 double），其后为 Arrow IPC 格式的文档表
+_CACHE_HEADER = struct.Struct('<d')
+
+# 命中缓存时，距上次记录的使用时间超过该秒数才刷新时间戳，避免每次命中都写库
+_CACHE_TOUCH_INTERVAL = 86400
+
+# 缓存值格式和分割算法的版本，参与缓存键计算；任一变化后旧条目自然失效，由 clear_cache 清理
+_CACHE_FORMAT = b'arrow-v2'
+
+# 文档缓存表结构：文本内容 + JSON 序列化的元数据
+_CACHE_SCHEMA = pa.schema([('content', pa.string()), ('metadata', pa.string())])
+
+# 批量加载时文件数不少于该值才启用进程池，文件较少时进程启动开销得不偿失，改用线程池
+_PARALLEL_MIN_FILES = 8
+
+# 单个 PDF 页数不少于该值才按页分块交给进程池提取文本，页数较少时单进程更快
+_PDF_PARALLEL_MIN_PAGES = 16
+
+# 向量数据库批量写入的文本块数，攒够后一次性计算嵌入并写入
+_ADD_BATCH_SIZE = 256
+
+# 线程池默认线程数：文件读取和解析多为 I/O 等待，线程数可以多于 CPU 核数
+_DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 文本分割的分隔符，按优先级排序
+_SEPARATORS = ["\n\n", "\n", "。", "！", "？", ".", "!", "?", " ", ""]
+
+# 分隔符参与缓存键计算，修改分隔符后旧的分割结果不再命中
+_SEPARATORS_KEY = "\x1f".join(_SEPARATORS).encode('utf-8')
+
+# 已打开的 LMDB 环境：同一进程内每个路径只能打开一次，同一缓存目录的多个 DataLoader 共用一个
+_ENVS: Dict[str, lmdb.Environment] = {}
+_ENVS_LOCK = threading.Lock()
+
+def _open_env(path: str, map_size: int) -> lmdb.Environment:
+    """
+    打开缓存目录对应的 LMDB 环境，已打开时直接复用
+    
+    Args:
+        path: 缓存目录
+        map_size: 内存映射大小上限（字节），复用已打开的环境时沿用其原有大小
+    
+    Returns:
+        lmdb.Environment: LMDB 环境
+    """
+    key = os.path.realpath(path)
+    with _ENVS_LOCK:
+        env = _ENVS.get(key)
+        if env is None:
+            env = _ENVS[key] = lmdb.open(key, map_size=map_size, subdir=True, readahead=False)
+        return env
+
+def _chunk_hash(text: str) -> bytes:
+    """计算文本块内容的 128 位 blake2b 摘要，用于去重"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def _encode_documents(docs: Sequence[Document]) -> bytes:
+    """
+    将文档列表编码为 Arrow IPC 字节流
+    
+    Args:
+        docs: 文档列表
+    
+    Returns:
+        bytes: Arrow IPC 字节流
+    """
+    table = pa.table({
+        'content': [doc.page_content for doc in docs],
+        'metadata': [json.dumps(doc.metadata, ensure_ascii=False, default=str) for doc in docs],
+    }, schema=_CACHE_SCHEMA)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, _CACHE_SCHEMA) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _decode_documents(data: Union[bytes, memoryview]) -> List[Document]:
+    """
+    将 Arrow IPC 字节流解码为文档列表
+    
+    Args:
+        data: _encode_documents 生成的 Arrow IPC 字节流
+    
+    Returns:
+        List[Document]: 文档列表
+    """
+    table = pa.ipc.open_stream(data).read_all()
+    return [Document(page_content=content, metadata=json.loads(metadata))
+            for content, metadata in zip(table.column('content').to_pylist(),
+                                         table.column('metadata').to_pylist())]
+
+class _LazyLoader:
+    """
+    按需导入的文档加载器工厂
+    首次调用时才从 langchain_community.document_loaders（或指定模块）导入加载器类，
+    只加载 txt 时不必为 PDF、Excel 等加载器的依赖付出导入时间；实例可被 pickle
+    """
+    
+    def __init__(self,
+                 class_name: str,
+                 module: str = 'langchain_community.document_loaders',
+                 **defaults: Any):
+        """
+        初始化加载器工厂
+        
+        Args:
+            class_name: 加载器类名
+            module: 加载器所在模块，以 "." 开头时相对于本包导入
+            **defaults: 预先绑定的加载器参数
+        """
+        self.class_name = class_name
+        self.module = module
+        self.defaults = defaults
+        self._cls = None
+    
+    def __call__(self, path: str, **kwargs):
+        if self._cls is None:
+            module = importlib.import_module(self.module, __package__)
+            self._cls = getattr(module, self.class_name)
+        return self._cls(path, **self.defaults, **kwargs)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 已导入的类不随实例传给子进程，子进程按需重新导入
+        return {**self.__dict__, '_cls': None}
+
+def _embedding_namespace(embeddings: Embeddings) -> str:
+    """嵌入缓存的命名空间：取嵌入模型名称，不同模型的向量互不混用"""
+    for attr in ('model_name', 'model'):
+        name = getattr(embeddings, attr, None)
+        if isinstance(name, str) and name:
+            return name
+    return type(embeddings).__name__
+
+def _make_text_splitter(chunk_size: int, chunk_overlap: int) -> RegexTextSplitter:
+    """
+    创建文本分割器
+    
+    Args:
+        chunk_size: 每个文本块的最大字符数
+        chunk_overlap: 相邻文本块的重叠字符数
+    
+    Returns:
+        RegexTextSplitter: 文本分割器
+    """
+    return RegexTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,  # 计算文本长度的函数
+        separators=_SEPARATORS
+    )
+
+def _iter_split_file(file_path: str,
+                     file_type: str,
+                     text_splitter: RegexTextSplitter,
+                     **kwargs) -> Iterator[Document]:
+    """
+    使用 LangChain 加载器逐页加载文件并分割文本
+    每次只持有一页原始文档，分割完即释放，不会同时保留整个文件的原始文档和分割结果
+    
+    Args:
+        file_path: 文件路径
+        file_type: 文件类型
+        text_splitter: 文本分割器
+        **kwargs: 传递给特定加载器的额外参数
+    
+    Yields:
+        Document: 分割后的文本块
+    """
+    # SUPPORTED_FORMATS 中的值都是 factory(path, **kwargs) 形式的加载器工厂
+    loader = DataLoader.SUPPORTED_FORMATS[file_type](file_path, **kwargs)
+    # 未实现 lazy_load 的加载器会回退为 load()，行为与之前一致
+    for page in loader.lazy_load():
+        yield from text_splitter.split_documents([page])
+
+def _split_file(file_path: str,
+                file_type: str,
+                text_splitter: RegexTextSplitter,
+                **kwargs) -> List[Document]:
+    """
+    使用 LangChain 加载器加载文件并分割文本
+    
+    Args:
+        file_path: 文件路径
+        file_type: 文件类型
+        text_splitter: 文本分割器
+        **kwargs: 传递给特定加载器的额外参数
+    
+    Returns:
+        List[Document]: 分割后的文档列表
+    """
+    return list(_iter_split_file(file_path, file_type, text_splitter, **kwargs))
+
+def _split_file_in_worker(file_path: str,
+                          file_type: str,
+                          chunk_size: int,
+                          chunk_overlap: int,
+                          kwargs: Dict[str, Any]) -> List[Document]:
+    """进程池工作函数：在子进程中重建文本分割器（开销很小），再加载并分割文件"""
+    return _split_file(file_path, file_type, _make_text_splitter(chunk_size, chunk_overlap), **kwargs)
+
+def _extract_pdf_pages(file_path: str,
+                       start: int,
+                       stop: int,
+                       doc_metadata: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    进程池工作函数：在子进程中打开 PDF，提取 [start, stop) 页的文本
+    
+    Args:
+        file_path: PDF 文件路径
+        start: 起始页下标
+        stop: 结束页下标（不含）
+        doc_metadata: 整个文档共用的元数据，由 _pdf_metadata 生成
+    
+    Returns:
+        List[Tuple[str, Dict[str, Any]]]: 每页的 (文本, 元数据)，元数据字段与 PyPDFLoader 一致
+    """
+    import pypdf
+    
+    reader = pypdf.PdfReader(file_path)
+    labels = reader.page_labels
+    return [
+        (reader.pages[i].extract_text().strip(),
+         {**doc_metadata, 'page': i, 'page_label': labels[i]})
+        for i in range(start, stop)
+    ]
+
+def _pdf_metadata(file_path: str, reader: Any) -> Dict[str, Any]:
+    """
+    生成与 PyPDFLoader 相同的文档级元数据：PDF 信息字典（producer、creator、creationdate 等）
+    加上 source 和 total_pages，并按 PyPDFLoader 的规则规范化字段名和取值
+    
+    Args:
+        file_path: PDF 文件路径
+        reader: 已打开的 pypdf.PdfReader
+    
+    Returns:
+        Dict[str, Any]: 文档级元数据
+    """
+    from langchain_community.document_loaders.parsers.pdf import _purge_metadata
+    
+    return _purge_metadata(
+        {'producer': 'PyPDF', 'creator': 'PyPDF', 'creationdate': ''}
+        | dict(reader.metadata or {})
+        | {'source': file_path, 'total_pages': len(reader.pages)}
+    )
+
+def _split_pdf_in_processes(file_path: str, text_splitter: RegexTextSplitter) -> Optional[List[Document]]:
+    """
+    按页并行加载 PDF 并分割文本
+    文本提取是纯 Python 的 CPU 密集型操作，受 GIL 限制，因此把页面分块交给进程池；
+    每个子进程只打开一次文件，处理一整块连续页面
+    
+    Args:
+        file_path: PDF 文件路径
+        text_splitter: 文本分割器
+    
+    Returns:
+        Optional[List[Document]]: 分割后的文档列表，页数太少或只有单核时返回 None，由调用方按顺序加载
+    """
+    import pypdf
+    
+    workers = os.cpu_count() or 1
+    reader = pypdf.PdfReader(file_path)
+    n_pages = len(reader.pages)
+    if workers < 2 or n_pages < _PDF_PARALLEL_MIN_PAGES:
+        return None
+    doc_metadata = _pdf_metadata(file_path, reader)
+    
+    # 每个进程分到约 4 块，兼顾负载均衡与重复打开文件的开销
+    block = -(-n_pages // (workers * 4))
+    starts = range(0, n_pages, block)
+    stops = [min(start + block, n_pages) for start in starts]
+    split_docs: List[Document] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+        for pages in executor.map(_extract_pdf_pages, repeat(file_path), starts, stops, repeat(doc_metadata)):
+            for text, metadata in pages:
+                split_docs.extend(text_splitter.split_documents([Document(page_content=text, metadata=metadata)]))
+    return split_docs
+
 class DataLoader:
     """
     灵活的数据加载器，支持多种文件格式并与 LangChain 集成
@@ -40,154 +325,528 @@ class DataLoader:
     5. 向量化存储
     """
     
-    # 支持的文件格式及其对应的加载器
+    # 支持的文件格式及其对应的加载器工厂（首次使用时才导入加载器类）
     SUPPORTED_FORMATS = {
-        'txt': lambda path, **kwargs: TextLoader(path, encoding='utf-8', **kwargs),  # 文本文件，使用UTF-8编码
-        'text': lambda path, **kwargs: TextLoader(path, encoding='utf-8', **kwargs),  # 文本文件(.text扩展名)，使用UTF-8编码
-        'csv': CSVLoader,  # CSV文件
-        'json': JSONLoader,  # JSON文件
-        'xlsx': UnstructuredExcelLoader,  # Excel文件
-        'xls': UnstructuredExcelLoader,  # Excel文件
-        'pdf': PyPDFLoader,  # PDF文件
-        'md': UnstructuredMarkdownLoader  # Markdown文件
+        'txt': _LazyLoader('TextLoader', encoding='utf-8'),  # 文本文件，使用UTF-8编码
+        'text': _LazyLoader('TextLoader', encoding='utf-8'),  # 文本文件(.text扩展名)，使用UTF-8编码
+        'csv': _LazyLoader('CSVLoader'),  # CSV文件
+        'json': _LazyLoader('FastJSONLoader', '.json_loader'),  # JSON文件，orjson 解析、JMESPath 查询
+        'xlsx': _LazyLoader('UnstructuredExcelLoader'),  # Excel文件
+        'xls': _LazyLoader('UnstructuredExcelLoader'),  # Excel文件
+        'pdf': _LazyLoader('PyPDFLoader'),  # PDF文件
+        'md': _LazyLoader('UnstructuredMarkdownLoader')  # Markdown文件
     }
     
     def __init__(self, cache_dir: Optional[str] = None, persist_dir: Optional[str] = None,
-                api_key: Optional[str] = None, base_url: Optional[str] = None):
+                api_key: Optional[str] = None, base_url: Optional[str] = None,
+                cache_map_size: int = 2**30, embeddings: Optional[Embeddings] = None):
         """
         初始化数据加载器
         
         Args:
-            cache_dir: 缓存目录路径，用于存储处理后的文档
+            cache_dir: 缓存目录路径，用于存储处理后的文档和文本块嵌入
             persist_dir: 向量数据库持久化目录
             api_key: OpenAI API密钥或AiHubMix API密钥
             base_url: API基础URL，用于自定义API端点
+            cache_map_size: LMDB 缓存的最大容量（字节）
+            embeddings: 嵌入模型，为 None 时使用 OpenAI Embeddings
         """
         self.cache_dir = cache_dir
         self.persist_dir = persist_dir
+        # 多线程加载时保护缓存写入和向量数据库写入（可重入：_store 内会调用 flush）
+        self._lock = threading.RLock()
+        # 等待写入向量数据库的文本块及其内容哈希（去重时已算出，写入时直接复用）
+        self._pending: List[Document] = []
+        self._pending_hashes: List[bytes] = []
+        self._batch_size = _ADD_BATCH_SIZE
+        # 文档缓存：单个 LMDB 环境，所有文件共用一次内存映射
+        self._env = None
         if cache_dir:
             os.makedirs(cache_dir, exist_ok=True)
+            self._env = _open_env(cache_dir, cache_map_size)
         if persist_dir:
             os.makedirs(persist_dir, exist_ok=True)
             
         # 初始化文本分割器
         # 用于将长文本分割成适合处理的较小块
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,  # 每个文本块的最大字符数
-            chunk_overlap=200,  # 相邻文本块的重叠字符数
-            length_function=len,  # 计算文本长度的函数
-            # 文本分割的分隔符，按优先级排序
-            separators=["\n\n", "\n", "。", "！", "？", ".", "!", "?", " ", ""]
-        )
-        
-        # 配置OpenAI Embeddings
-        api_key = api_key or os.environ.get("AIHUBMIX_API_KEY") or os.environ.get("OPENAI_API_KEY")
-        embedding_kwargs = {"api_key": api_key}
-        if base_url or os.environ.get("OPENAI_BASE_URL"):
-            embedding_kwargs["base_url"] = base_url or os.environ.get("OPENAI_BASE_URL") or "https://aihubmix.com/v1"
-            
-        # 初始化嵌入模型
-        self.embeddings = OpenAIEmbeddings(**embedding_kwargs)
+        self.chunk_size = 1000  # 每个文本块的最大字符数
+        self.chunk_overlap = 200  # 相邻文本块的重叠字符数
+        self.text_splitter = _make_text_splitter(self.chunk_size, self.chunk_overlap)
+        # 缓存键中与文件无关的分割参数部分，只拼接一次
+        self._split_params_key = (self.chunk_size.to_bytes(4, 'little')
+                                  + self.chunk_overlap.to_bytes(4, 'little')
+                                  + _SEPARATORS_KEY)
+        
+        # 初始化嵌入模型，未指定时使用 OpenAI Embeddings
+        if embeddings is None:
+            from langchain_openai import OpenAIEmbeddings  # 文本嵌入模型
+            api_key = api_key or os.environ.get("AIHUBMIX_API_KEY") or os.environ.get("OPENAI_API_KEY")
+            embedding_kwargs = {"api_key": api_key}
+            if base_url or os.environ.get("OPENAI_BASE_URL"):
+                embedding_kwargs["base_url"] = base_url or os.environ.get("OPENAI_BASE_URL") or "https://aihubmix.com/v1"
+            embeddings = OpenAIEmbeddings(**embedding_kwargs)
+        # 嵌入缓存：按文本块内容寻址，重复出现的内容不再重复计算嵌入（跨运行、跨向量数据库有效）
+        if cache_dir:
+            from langchain.embeddings import CacheBackedEmbeddings  # 嵌入缓存
+            from langchain.storage import LocalFileStore  # 嵌入缓存存储
+            embeddings = CacheBackedEmbeddings.from_bytes_store(
+                embeddings,
+                LocalFileStore(os.path.join(cache_dir, "emb")),
+                namespace=_embedding_namespace(embeddings),
+                key_encoder="blake2b"
+            )
+        self.embeddings = embeddings
         
         # 初始化向量数据库
         self.vectorstore = None
         if persist_dir:
+            from langchain_chroma import Chroma  # 向量数据库
             self.vectorstore = Chroma(
                 persist_directory=persist_dir,
                 embedding_function=self.embeddings
             )
+    
+        # 文本块去重索引：记录已写入向量数据库的文本块哈希，与向量数据库放在同一目录
+        self._seen: Set[bytes] = set()
+        self._hash_db = None
+        if persist_dir:
+            self._hash_db = sqlite3.connect(
+                os.path.join(persist_dir, "chunk_hashes.sqlite3"),
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._hash_db.execute("CREATE TABLE IF NOT EXISTS chunk_hashes(hash BLOB PRIMARY KEY)")
+            self._seen.update(row[0] for row in self._hash_db.execute("SELECT hash FROM chunk_hashes"))
+    
+    def _cache_key(self, file_path: Path, file_type: str, loader_kwargs: Dict[str, Any]) -> bytes:
+        """
+        计算文档缓存键
+        由文件内容、文件类型、加载器参数和分割参数决定，文件和参数不变时缓存长期有效
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型
+            loader_kwargs: 传递给加载器的额外参数（如 JSON 查询表达式），不同参数的加载结果分别缓存
+        
+        Returns:
+            bytes: blake2b 摘要
+        """
+        h = hashlib.blake2b()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        h.update(self._split_params_key)
+        h.update(file_type.encode('utf-8'))
+        if loader_kwargs:
+            # 没有加载器参数时不参与计算，已有的缓存条目保持有效
+            h.update(repr(sorted(loader_kwargs.items())).encode('utf-8'))
+        h.update(_CACHE_FORMAT)
+        return h.digest()
             
-    def load(self, 
-             file_path: Union[str, Path], 
-             file_type: Optional[str] = None,
-             **kwargs) -> List[Document]:
+    def _resolve(self, file_path: Union[str, Path], file_type: Optional[str]) -> Tuple[Path, str]:
         """
-        加载文件并使用 LangChain 加载器处理
+        检查文件并确定文件类型
         
         Args:
             file_path: 文件路径
             file_type: 文件类型（如果为None则自动检测）
-            **kwargs: 传递给特定加载器的额外参数
-            
+        
         Returns:
-            List[Document]: LangChain Document 对象列表
+            Tuple[Path, str]: (文件路径, 文件类型)
         """
         file_path = Path(file_path)
         
         # 检查文件是否存在
         if not file_path.exists():
             raise FileNotFoundError(f"文件不存在: {file_path}")
-            
+        
         # 如果未指定文件类型，从文件扩展名自动检测
         if file_type is None:
             file_type = file_path.suffix.lower()[1:]  # 移除点号
-            
-        # 检查缓存
-        if self.cache_dir:
-            cache_path = Path(self.cache_dir) / f"{file_path.stem}_{datetime.now().strftime('%Y%m%d')}.pkl"
-            if cache_path.exists():
-                logger.info(f"从缓存加载: {cache_path}")
-                import pickle
-                with open(cache_path, 'rb') as f:
-                    return pickle.load(f)
         
         # 检查文件类型是否支持
         if file_type not in self.SUPPORTED_FORMATS:
             raise ValueError(f"不支持的文件类型: {file_type}. 支持的类型: {list(self.SUPPORTED_FORMATS.keys())}")
+        
+        return file_path, file_type
+    
+    def _get_cached(self,
+                    file_path: Path,
+                    file_type: str,
+                    loader_kwargs: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[List[Document]]]:
+        """
+        查找文档缓存
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型
+            loader_kwargs: 传递给加载器的额外参数
+        
+        Returns:
+            Tuple: (缓存键，未启用缓存时为 None; 命中的文档列表，未命中时为 None)
+        """
+        if self._env is None:
+            return None, None
+        cache_key = self._cache_key(file_path, file_type, loader_kwargs)
+        with self._env.begin() as txn:
+            value = txn.get(cache_key)
+        if value is None:
+            return cache_key, None
+        logger.info("从缓存加载: %s", file_path)
+        
+        # 刷新最近使用时间，clear_cache 据此按最近最少使用淘汰
+        now = time.time()
+        if now - _CACHE_HEADER.unpack_from(value)[0] > _CACHE_TOUCH_INTERVAL:
+            with self._lock:
+                self._put_cache(file_path, cache_key, _CACHE_HEADER.pack(now) + value[_CACHE_HEADER.size:])
+        return cache_key, _decode_documents(memoryview(value)[_CACHE_HEADER.size:])
+    
+    def _put_cache(self, file_path: Path, cache_key: bytes, value: bytes) -> bool:
+        """
+        写入一个缓存条目；缓存只是加速手段，写入失败只记录警告，不影响加载
+        缓存已满时按最近最少使用淘汰后重试
+        
+        Args:
+            file_path: 文件路径
+            cache_key: 缓存键
+            value: 缓存值（使用时间头部 + Arrow IPC 字节流）
+        
+        Returns:
+            bool: 是否写入成功
+        """
+        map_size = self._env.info()['map_size']
+        # 条目大小不含 LMDB 的页和 B 树开销，且大条目需要连续的空闲页，
+        # 先淘汰到约四分之一，仍写不下时清空缓存再试
+        evict_to = (max(0, map_size // 4 - len(value)), 0)
+        for attempt in range(len(evict_to) + 1):
+            try:
+                with self._env.begin(write=True) as txn:
+                    txn.put(cache_key, value)
+                return True
+            except lmdb.MapFullError as e:
+                if attempt == len(evict_to):
+                    logger.warning("跳过文档缓存 %s: %s", file_path, e)
+                    return False
+                logger.warning("文档缓存已满，淘汰最久未使用的条目后重试: %s", self.cache_dir)
+                self.clear_cache(max_size=evict_to[attempt])
+            except lmdb.Error as e:
+                logger.warning("跳过文档缓存 %s: %s", file_path, e)
+                return False
+    
+    def _store(self, file_path: Path, cache_key: Optional[bytes], split_docs: List[Document]) -> None:
+        """
+        缓存分割后的文档，并把新文本块加入向量数据库的待写入队列，攒够一批再统一写入
+        
+        Args:
+            file_path: 文件路径
+            cache_key: 缓存键，为 None 时不写缓存（未启用缓存或已命中缓存）
+            split_docs: 分割后的文档列表
+        """
+        new_docs, hashes = self._cache_and_dedup(file_path, cache_key, split_docs)
+        if new_docs:
+            with self._lock:
+                self._pending.extend(new_docs)
+                self._pending_hashes.extend(hashes)
+                if len(self._pending) >= self._batch_size:
+                    self.flush()
+    
+    def _cache_and_dedup(self,
+                         file_path: Path,
+                         cache_key: Optional[bytes],
+                         split_docs: List[Document]) -> Tuple[List[Document], List[bytes]]:
+        """
+        缓存分割后的文档，并筛出尚未写入向量数据库的文本块
+        
+        Args:
+            file_path: 文件路径
+            cache_key: 缓存键，为 None 时不写缓存（未启用缓存或已命中缓存）
+            split_docs: 分割后的文档列表
+        
+        Returns:
+            Tuple: (需要写入向量数据库的新文本块, 对应的内容哈希)，未启用向量数据库时均为空
+        """
+        with self._lock:
+            # 缓存处理后的文档，值头部写入使用时间戳，便于按时间清理
+            if cache_key is not None:
+                if self._put_cache(file_path, cache_key, _CACHE_HEADER.pack(time.time()) + _encode_documents(split_docs)):
+                    logger.info("文档已缓存: %s", file_path)
+        
+            # 跳过内容已写入（或正在写入）的文本块
+            if not self.vectorstore:
+                return [], []
+            seen = self._seen
+            new_docs: List[Document] = []
+            hashes: List[bytes] = []
+            for doc in split_docs:
+                h = _chunk_hash(doc.page_content)
+                if h not in seen:
+                    seen.add(h)
+                    new_docs.append(doc)
+                    hashes.append(h)
+            if len(new_docs) < len(split_docs):
+                logger.info("跳过 %s 个重复文本块: %s", len(split_docs) - len(new_docs), file_path)
+            return new_docs, hashes
+    
+    def flush(self) -> None:
+        """将待写入的文本块一次性添加到向量数据库"""
+        with self._lock:
+            if not self._pending or not self.vectorstore:
+                return
+            # 以内容哈希作为文档 ID，Chroma 按 ID upsert，重复写入同一文本块不会产生重复记录
+            try:
+                self.vectorstore.add_documents(self._pending, ids=[h.hex() for h in self._pending_hashes])
+            except BaseException:
+                # 写入失败时丢弃这一批，并从去重集合中移除，之后重新加载（含缓存命中）时会补写
+                self._forget_hashes(self._pending_hashes)
+                self._pending = []
+                self._pending_hashes = []
+                raise
+            # self.vectorstore.persist()  # Chroma类不再支持persist方法
+            self._record_hashes(self._pending_hashes)
+            logger.info("已添加 %s 个文本块到向量数据库", len(self._pending))
+            self._pending = []
+            self._pending_hashes = []
+    
+    def _forget_hashes(self, hashes: List[bytes]) -> None:
+        """将写入向量数据库失败的文本块哈希移出去重集合，使其下次加载时重新写入"""
+        with self._lock:
+            self._seen.difference_update(hashes)
+    
+    def _record_hashes(self, hashes: List[bytes]) -> None:
+        """将已写入向量数据库的文本块哈希记入去重索引"""
+        if self._hash_db is None:
+            return
+        with self._lock:
+            self._hash_db.executemany(
+                "INSERT OR IGNORE INTO chunk_hashes(hash) VALUES (?)",
+                [(h,) for h in hashes]
+            )
+    
+    def __enter__(self) -> "DataLoader":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+    
+    def load(self, 
+             file_path: Union[str, Path], 
+             file_type: Optional[str] = None,
+             **kwargs) -> List[Document]:
+        """
+        加载文件并使用 LangChain 加载器处理
+        新文本块先进入待写入队列，攒够一批或调用 flush 时才写入向量数据库
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型（如果为None则自动检测）
+            **kwargs: 传递给特定加载器的额外参数
             
-        try:
-            # 使用 LangChain 加载器加载文件
-            loader_class_or_func = self.SUPPORTED_FORMATS[file_type]
-            
-            # 处理函数和类两种情况
-            if callable(loader_class_or_func) and not isinstance(loader_class_or_func, type):
-                # 对于函数，直接调用
-                loader = loader_class_or_func(str(file_path), **kwargs)
-            else:
-                # 对于类，实例化
-                loader = loader_class_or_func(str(file_path), **kwargs)
-                
-            documents = loader.load()
-            
-            # 分割文本
-            split_docs = self.text_splitter.split_documents(documents)
-            
-            # 缓存处理后的文档
-            if self.cache_dir:
-                cache_path = Path(self.cache_dir) / f"{file_path.stem}_{datetime.now().strftime('%Y%m%d')}.pkl"
-                import pickle
-                with open(cache_path, 'wb') as f:
-                    pickle.dump(split_docs, f)
-                logger.info(f"文档已缓存到: {cache_path}")
+        Returns:
+            List[Document]: LangChain Document 对象列表
+        """
+        return self._load(file_path, file_type, True, kwargs)
+    
+    def _load(self,
+              file_path: Union[str, Path],
+              file_type: Optional[str],
+              page_parallel: bool,
+              loader_kwargs: Dict[str, Any]) -> List[Document]:
+        """
+        load 的实现
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型（如果为None则自动检测）
+            page_parallel: 是否允许大 PDF 按页并行提取；只在顶层同步调用时启用，
+                           避免线程池或事件循环中的每个文件各自创建一个进程池
+            loader_kwargs: 传递给特定加载器的额外参数
+        
+        Returns:
+            List[Document]: LangChain Document 对象列表
+        """
+        file_path, file_type = self._resolve(file_path, file_type)
             
-            # 添加到向量数据库
-            if self.vectorstore:
-                self.vectorstore.add_documents(split_docs)
-                # self.vectorstore.persist()  # Chroma类不再支持persist方法
-                logger.info(f"文档已添加到向量数据库: {file_path}")
+        # 检查缓存
+        cache_key, cached_docs = self._get_cached(file_path, file_type, loader_kwargs)
+        if cached_docs is not None:
+            # 缓存命中不代表文本块已写入向量数据库（上次未 flush 或写入失败），按哈希补入待写入队列
+            self._store(file_path, None, cached_docs)
+            return cached_docs
             
+        try:
+            # 加载并分割文本
+            split_docs = self._split(file_path, file_type, page_parallel, loader_kwargs)
+            self._store(file_path, cache_key, split_docs)
+            return split_docs
+        
+        except Exception as e:
+            logger.error("加载文件时出错 %s: %s", file_path, e)
+            raise
+    
+    def _split(self,
+               file_path: Path,
+               file_type: str,
+               page_parallel: bool,
+               loader_kwargs: Dict[str, Any]) -> List[Document]:
+        """
+        加载并分割单个文件
+        允许时大 PDF 按页并行提取，带加载器参数（如密码）时仍交给 PyPDFLoader
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型
+            page_parallel: 是否允许大 PDF 按页并行提取
+            loader_kwargs: 传递给特定加载器的额外参数
+        
+        Returns:
+            List[Document]: 分割后的文档列表
+        """
+        split_docs = None
+        if page_parallel and file_type == 'pdf' and not loader_kwargs:
+            split_docs = _split_pdf_in_processes(str(file_path), self.text_splitter)
+        if split_docs is None:
+            split_docs = _split_file(str(file_path), file_type, self.text_splitter, **loader_kwargs)
+        return split_docs
+    
+    async def aload(self,
+                    file_path: Union[str, Path],
+                    file_type: Optional[str] = None,
+                    **kwargs) -> List[Document]:
+        """
+        异步加载文件
+        文件读取和文本分割在线程中执行，不阻塞事件循环；新文本块直接写入向量数据库，不进入待写入队列
+        
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型（如果为None则自动检测）
+            **kwargs: 传递给特定加载器的额外参数
+        
+        Returns:
+            List[Document]: LangChain Document 对象列表
+        """
+        return await self._aload(file_path, file_type, None, **kwargs)
+    
+    async def abatch_load(self,
+                          file_paths: List[Union[str, Path]],
+                          file_type: Optional[str] = None,
+                          max_concurrency: int = 16,
+                          **kwargs) -> List[List[Document]]:
+        """
+        异步并发加载多个文件
+        
+        Args:
+            file_paths: 文件路径列表
+            file_type: 文件类型（如果为None则自动检测）
+            max_concurrency: 同时进行的向量数据库写入（嵌入请求）数上限
+            **kwargs: 传递给特定加载器的额外参数
+        
+        Returns:
+            List[List[Document]]: 每个文件的文档列表，顺序与 file_paths 一致
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        return list(await asyncio.gather(
+            *(self._aload(path, file_type, semaphore, **kwargs) for path in file_paths)
+        ))
+    
+    async def _aload(self,
+                     file_path: Union[str, Path],
+                     file_type: Optional[str],
+                     semaphore: Optional[asyncio.Semaphore],
+                     **kwargs) -> List[Document]:
+        """aload 与 abatch_load 的实现，semaphore 限制并发的向量数据库写入"""
+        file_path, file_type = self._resolve(file_path, file_type)
+        
+        # 计算缓存键需要读取整个文件，放到线程中执行
+        cache_key, cached_docs = await asyncio.to_thread(self._get_cached, file_path, file_type, kwargs)
+        
+        try:
+            if cached_docs is not None:
+                # 缓存命中时不重写缓存，只补写尚未写入向量数据库的文本块
+                split_docs, cache_key = cached_docs, None
+            else:
+                split_docs = await asyncio.to_thread(self._split, file_path, file_type, False, kwargs)
+            new_docs, hashes = await asyncio.to_thread(self._cache_and_dedup, file_path, cache_key, split_docs)
+            if new_docs:
+                try:
+                    async with semaphore or contextlib.nullcontext():
+                        await self.vectorstore.aadd_documents(new_docs, ids=[h.hex() for h in hashes])
+                except BaseException:
+                    # 去重时已将哈希标记为已写入，写入失败（或被取消）时撤销，否则这些文本块永远不会再写入
+                    self._forget_hashes(hashes)
+                    raise
+                await asyncio.to_thread(self._record_hashes, hashes)
+                logger.info("已添加 %s 个文本块到向量数据库", len(new_docs))
             return split_docs
             
         except Exception as e:
-            logger.error(f"加载文件时出错 {file_path}: {str(e)}")
+            logger.error("加载文件时出错 %s: %s", file_path, e)
             raise
     
     def batch_load(self, 
                   file_paths: List[Union[str, Path]], 
                   file_type: Optional[str] = None,
+                  max_workers: Optional[int] = None,
                   **kwargs) -> List[List[Document]]:
         """
-        批量加载多个文件
+        批量加载多个文件，新文本块按批写入向量数据库，结束时写入剩余部分
+        文件较少时，在线程池中并发加载；文件较多时，在进程池中并行解析和分割
+        未命中缓存的文件。缓存写入和向量数据库写入仍在当前进程中完成
         
         Args:
             file_paths: 文件路径列表
             file_type: 文件类型（如果为None则自动检测）
+            max_workers: 最大并发数，为 None 时线程池取 min(32, CPU 核数 * 4)，进程池取 CPU 核数
             **kwargs: 传递给特定加载器的额外参数
             
         Returns:
-            List[List[Document]]: 每个文件的文档列表
+            List[List[Document]]: 每个文件的文档列表，顺序与 file_paths 一致
         """
-        return [self.load(path, file_type, **kwargs) for path in file_paths]
+        if not file_paths:
+            return []
+        try:
+            return self._batch_load(file_paths, file_type, max_workers, **kwargs)
+        finally:
+            # 写入最后一批不足 _batch_size 的文本块
+            self.flush()
+    
+    def _batch_load(self,
+                    file_paths: List[Union[str, Path]],
+                    file_type: Optional[str],
+                    max_workers: Optional[int],
+                    **kwargs) -> List[List[Document]]:
+        """batch_load 的实现"""
+        if len(file_paths) < _PARALLEL_MIN_FILES:
+            workers = min(max_workers or _DEFAULT_THREAD_WORKERS, len(file_paths))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(lambda path: self._load(path, file_type, False, kwargs), file_paths))
+        
+        results: List[Optional[List[Document]]] = [None] * len(file_paths)
+        pending = []  # 未命中缓存的文件: (下标, 文件路径, 文件类型, 缓存键)
+        for i, path in enumerate(file_paths):
+            path, path_type = self._resolve(path, file_type)
+            cache_key, cached_docs = self._get_cached(path, path_type, kwargs)
+            if cached_docs is not None:
+                self._store(path, None, cached_docs)
+                results[i] = cached_docs
+            else:
+                pending.append((i, path, path_type, cache_key))
+        
+        if pending:
+            workers = min(max_workers or os.cpu_count() or 1, len(pending))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                split_results = executor.map(
+                    _split_file_in_worker,
+                    [str(path) for _, path, _, _ in pending],
+                    [path_type for _, _, path_type, _ in pending],
+                    repeat(self.chunk_size),
+                    repeat(self.chunk_overlap),
+                    repeat(kwargs)
+                )
+                for (i, path, _, cache_key), split_docs in zip(pending, split_results):
+                    self._store(path, cache_key, split_docs)
+                    results[i] = split_docs
+        
+        return results
     
     def search(self, query: str, k: int = 4) -> List[Document]:
         """
@@ -203,25 +862,35 @@ class DataLoader:
         if not self.vectorstore:
             raise ValueError("向量数据库未初始化")
             
+        # 先写入尚未提交的文本块，保证刚加载的文档可以被检索到
+        self.flush()
         return self.vectorstore.similarity_search(query, k=k)
     
-    def clear_cache(self, older_than_days: int = 7) -> None:
+    def clear_cache(self, older_than_days: int = 7, max_size: Optional[int] = None) -> None:
         """
-        清理旧的缓存文件
+        清理旧的缓存条目
         
         Args:
-            older_than_days: 清理多少天前的缓存文件
+            older_than_days: 清理多少天内未被使用的缓存条目
+            max_size: 缓存总大小上限（字节），超出时从最久未使用的条目开始淘汰
         """
-        if not self.cache_dir:
+        if self._env is None:
             return
             
-        cache_dir = Path(self.cache_dir)
-        current_time = datetime.now()
-        
-        # 遍历缓存目录中的所有文件
-        for cache_file in cache_dir.glob("*.pkl"):
-            file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-            # 如果文件超过指定天数，则删除
-            if (current_time - file_time).days > older_than_days:
-                cache_file.unlink()
-                logger.info(f"已清理旧缓存文件: {cache_file}") 
\ No newline at end of file
+        cutoff = time.time() - older_than_days * 86400
+        with self._env.begin(write=True, buffers=True) as txn:
+            # buffers=True 时值是指向内存映射的 memoryview，只读取头部的使用时间，
+            # 不复制也不反序列化文档；键需复制出来，后续删除会使这些视图失效
+            entries = sorted(
+                (_CACHE_HEADER.unpack_from(value)[0], bytes(key), len(value))
+                for key, value in txn.cursor()
+            )
+            total = sum(size for _, _, size in entries)
+            for used_at, key, size in entries:
+                # 过期条目直接删除；超出容量上限时继续按使用时间从旧到新淘汰
+                if used_at >= cutoff and (max_size is None or total <= max_size):
+                    break
+                txn.delete(key)
+                total -= size
+                logger.info("已清理旧缓存条目: %s", key.hex())
+        self._env.sync()
@@ -1,7 +1,7 @@
 """
 Data processor implementation.
 """
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
@@ -14,7 +14,7 @@ class DataProcessor:
     
     def __init__(self):
         """Initialize the data processor."""
-        self.scalers: Dict[str, Any] = {}
+        self.scalers: Dict[Tuple[str, ...], Any] = {}  # Fitted scalers keyed by column set
         
     def clean_data(self, 
                   data: pd.DataFrame,
@@ -45,6 +45,11 @@ class DataProcessor:
         """
         Normalize numerical columns.
         
+        All columns are fitted and transformed together in one scaler call;
+        the fitted scaler is reused for later calls with the same columns.
+        The values are copied out once, scaled in place in that buffer and
+        written back into the existing block when the columns are float64.
+        
         Args:
             data: Input DataFrame
             columns: Columns to normalize (all numerical columns if None)
@@ -55,19 +60,31 @@ class DataProcessor:
         """
         if columns is None:
             columns = data.select_dtypes(include=[np.number]).columns
+        columns = list(columns)
+        if not columns:
+            return data
             
-        for col in columns:
-            if col not in self.scalers:
-                if method == 'standard':
-                    self.scalers[col] = StandardScaler()
-                elif method == 'minmax':
-                    self.scalers[col] = MinMaxScaler()
-                else:
-                    raise ValueError(f"Unsupported normalization method: {method}")
-                    
-                self.scalers[col].fit(data[[col]])
+        # One float64 copy of the block; the copy=False scalers then transform it in place
+        values = data[columns].to_numpy(dtype=np.float64, copy=True)
+        key = tuple(columns)
+        scaler = self.scalers.get(key)
+        if scaler is None:
+            if method == 'standard':
+                scaler = StandardScaler(copy=False)
+            elif method == 'minmax':
+                scaler = MinMaxScaler(copy=False)
+            else:
+                raise ValueError(f"Unsupported normalization method: {method}")
                 
-            data[col] = self.scalers[col].transform(data[[col]])
+            scaler.fit(values)
+            self.scalers[key] = scaler
+            
+        values = scaler.transform(values)
+        if (data.dtypes[columns] == np.float64).all():
+            # Float columns are overwritten in their existing block, with no new column arrays
+            data.loc[:, columns] = values
+        else:
+            data[columns] = values
             
         return data
     
@@ -0,0 +1,175 @@
+"""
+文本分割器模块
+提供基于分隔符查表的快速文本分割器，主要功能：
+- 一次扫描找出各级分隔符的位置，不再按分隔符逐级递归
+  （单字符分隔符用 NumPy 查表向量化判断，其余用预编译正则）
+- 以起止偏移数组（结构化数组）表示分割结果，按需再生成字符串
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, overload
+import re
+import sys
+
+import numpy as np
+from langchain.text_splitter import TextSplitter
+
+class ChunkList(Sequence[str]):
+    """
+    文本块列表
+    内部只保存原文和每个块的起止偏移，访问某个块时才切片生成字符串
+    """
+    
+    def __init__(self, text: str, starts: np.ndarray, ends: np.ndarray):
+        """
+        初始化文本块列表
+        
+        Args:
+            text: 原始文本
+            starts: 每个块的起始偏移
+            ends: 每个块的结束偏移（不含）
+        """
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.text[self.starts[index]:self.ends[index]]
+    
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield text[start:end]
+
+class RegexTextSplitter(TextSplitter):
+    """
+    基于分隔符查表的文本分割器
+    一次扫描得到各级分隔符的全部候选切分点，再贪心地把每个块扩展到窗口内优先级最高的一级分隔符中
+    最远的切分点，窗口内没有任何分隔符时在 chunk_size 处硬切分并保留重叠；
+    构造参数与 RecursiveCharacterTextSplitter 相同，按相同的分隔符优先级切分，但不保证结果逐字一致
+    """
+    
+    def __init__(self, separators: Optional[List[str]] = None, **kwargs: Any):
+        """
+        初始化文本分割器
+        
+        Args:
+            separators: 分隔符列表，按优先级从高到低排列，空字符串表示允许在任意位置硬切分
+            **kwargs: 传递给父类的参数（chunk_size、chunk_overlap 等）
+        """
+        super().__init__(**kwargs)
+        self._separators = separators or ["\n\n", "\n", " ", ""]
+        parts = list(dict.fromkeys(s for s in self._separators if s))
+        # 单字符分隔符用覆盖全部 Unicode 码点的查找表（约 1.1 MB）按码点直接索引，
+        # 表中的值为分隔符的优先级（1 为最高，0 表示不是分隔符）
+        chars = [s for s in parts if len(s) == 1]
+        self._separator_lut = None
+        if chars:
+            self._separator_lut = np.zeros(sys.maxunicode + 1, dtype=np.uint8)
+            for c in chars:
+                self._separator_lut[ord(c)] = parts.index(c) + 1
+        # 多字符分隔符（如 "\n\n"）各用一个预编译正则查找：(优先级, 正则)
+        self._separator_res = [
+            (level, re.compile(re.escape(s))) for level, s in enumerate(parts, 1) if len(s) > 1
+        ]
+        self._n_levels = len(parts)
+    
+    def _boundaries(self, text: str) -> List[np.ndarray]:
+        """
+        查找各级分隔符的候选切分点
+        
+        Args:
+            text: 待分割文本
+        
+        Returns:
+            List[np.ndarray]: 按优先级从高到低排列，每级为升序的切分点偏移（分隔符之后的位置）
+        """
+        levels = [np.empty(0, dtype=np.int64)] * self._n_levels
+        lut = self._separator_lut
+        if lut is not None:
+            # UTF-32 编码后每个字符正好对应一个 uint32 码点，偏移与字符串下标一致；
+            # surrogatepass 保证 PDF 等来源中孤立的代理字符也能编码
+            code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            codes = lut.take(code_points)
+            positions = np.flatnonzero(codes)
+            position_levels = codes[positions]
+            positions += 1
+            for level in np.unique(position_levels).tolist():
+                levels[level - 1] = positions[position_levels == level]
+        for level, pattern in self._separator_res:
+            levels[level - 1] = np.fromiter((m.end() for m in pattern.finditer(text)), dtype=np.int64)
+        return levels
+    
+    def split_text(self, text: str) -> ChunkList:
+        """
+        分割文本
+        
+        Args:
+            text: 待分割文本
+        
+        Returns:
+            ChunkList: 文本块列表（按需生成字符串）
+        """
+        size = self._chunk_size
+        overlap = self._chunk_overlap
+        levels = [level for level in self._boundaries(text) if len(level)]
+        # 重叠部分只从与切分点同级或更高优先级的分隔符之后开始，与递归分割时按同级片段重叠一致；
+        # 第 k 级及以上的全部切分点在首次用到时合并（重复值不影响 searchsorted）
+        merged: Dict[int, np.ndarray] = {}
+        
+        starts: List[int] = []
+        ends: List[int] = []
+        start, n = 0, len(text)
+        while start < n:
+            # 窗口内优先级最高的一级分隔符中最远的切分点，没有时在 chunk_size 处硬切分
+            end = start + size
+            cut_level = -1  # 硬切分时为 -1
+            if end < n:
+                for k, level in enumerate(levels):
+                    idx = int(level.searchsorted(end, side='right')) - 1
+                    if idx >= 0 and level[idx] > start:
+                        end = int(level[idx])
+                        cut_level = k
+                        break
+            else:
+                end = n
+            
+            # 去掉块首尾的空白，与父类 strip_whitespace 的行为一致
+            s, e = start, end
+            if self._strip_whitespace:
+                while s < e and text[s].isspace():
+                    s += 1
+                while e > s and text[e - 1].isspace():
+                    e -= 1
+            if e > s:
+                starts.append(s)
+                ends.append(e)
+            if end >= n:
+                break
+            
+            if cut_level < 0:
+                # 硬切分时窗口内没有分隔符，直接回退 chunk_overlap 个字符；
+                # chunk_overlap 等于 chunk_size 时至少前进一个字符，避免死循环
+                start = max(end - overlap, start + 1)
+                continue
+            # 下一个块从 end - overlap 之后的第一个同级或更高级切分点开始，使重叠不超过 chunk_overlap
+            boundaries = merged.get(cut_level)
+            if boundaries is None:
+                boundaries = levels[0] if cut_level == 0 else np.sort(np.concatenate(levels[:cut_level + 1]))
+                merged[cut_level] = boundaries
+            idx = int(boundaries.searchsorted(end - overlap, side='left'))
+            if overlap > 0 and idx < len(boundaries) and start < boundaries[idx] < end:
+                start = int(boundaries[idx])
+            else:
+                start = end
+        
+        return ChunkList(text, np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64))
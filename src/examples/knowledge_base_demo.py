@@ -55,10 +55,9 @@ def add_document(kb, file_path, metadata=None):
         print(f"添加文档{'成功' if success else '失败'}")
         return success
     except Exception as e:
-        print(f"添加文档失败 {file_path}: {str(e)}")
-        # 打印详细的错误堆栈
-        import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        print(f"添加文档失败 {file_path}: {e}")
+        # 详细的错误堆栈交给日志记录，按日志级别决定是否输出
+        logger.exception("添加文档失败 %s", file_path)
         return False
 
 def search_documents(kb, query, k=3):
@@ -149,10 +148,8 @@ def main():
             print_kb_stats(kb)
             
     except Exception as e:
-        logger.error(f"程序运行出错: {str(e)}")
-        print(f"程序出错: {str(e)}")
-        import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.exception("程序运行出错")
+        print(f"程序出错: {e}")
         return 1
         
     return 0
@@ -1,4 +1,7 @@
-from typing import List
+from typing import Callable, ClassVar, Iterator, List, Optional, Sequence, Union
+import asyncio
+import re
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain.schema import BaseMessage, SystemMessage
 from ..config import Config
@@ -6,47 +9,143 @@ from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 进程内共享的 HTTP 客户端（启用 HTTP/2 多路复用），
+# 所有 ChatModel 实例复用同一连接池，TCP/TLS 握手只需进行一次
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=Config.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+)
+_shared_client = httpx.Client(http2=True, timeout=Config.HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+_shared_async_client = httpx.AsyncClient(http2=True, timeout=Config.HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+
+# 思考提示，要求模型先给出推理过程再给出最终答案
+THINKING_PROMPT = "请先思考如何回答这个问题，然后给出最终答案。思考过程要详细说明你的推理步骤。"
+
+# 模型输出中 "思考过程：...最终答案：..." 的结构，一次扫描同时取出两部分
+_THINK_RE = re.compile(r"思考过程：(?P<thinking>.*?)最终答案：(?P<answer>.*)", re.DOTALL)
+
 class ChatModel:
     """聊天模型类"""
     
+    # 所有实例共享的 ChatOpenAI 对象，首次使用时创建
+    _shared_model: ClassVar[Optional[ChatOpenAI]] = None
+    
     def __init__(self):
         """初始化聊天模型"""
-        self.model = ChatOpenAI(
-            **Config.get_model_config(),
-            api_key=Config.API_KEY,
-            base_url=Config.API_BASE
-        )
-        logger.info(f"初始化聊天模型: {Config.DEFAULT_MODEL}")
+        self.model = self._get_model()
+    
+    @classmethod
+    def _get_model(cls) -> ChatOpenAI:
+        """
+        获取共享的 ChatOpenAI 对象
+        模型参数全部来自 Config，各实例的配置相同，只需构建一次
+        
+        Returns:
+            ChatOpenAI: 共享的聊天模型
+        """
+        if cls._shared_model is None:
+            cls._shared_model = ChatOpenAI(
+                **Config.get_model_config(),
+                api_key=Config.API_KEY,
+                base_url=Config.API_BASE,
+                http_client=_shared_client,
+                http_async_client=_shared_async_client
+            )
+            logger.info("初始化聊天模型: %s", Config.DEFAULT_MODEL)
+        return cls._shared_model
     
-    def chat(self, messages: List[BaseMessage]) -> tuple[str, str]:
+    @staticmethod
+    def _with_thinking(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """在消息末尾追加思考提示"""
+        return list(messages) + [SystemMessage(content=THINKING_PROMPT)]
+    
+    @staticmethod
+    def split_thinking(content: str) -> tuple[str, str]:
+        """
+        分离思考过程和最终答案
+        
+        Args:
+            content: 模型返回的原始内容
+        
+        Returns:
+            tuple[str, str]: (最终答案, 思考过程)
+        """
+        match = _THINK_RE.search(content)
+        if match:
+            return match["answer"].strip(), match["thinking"].strip()
+        
+        # 如果没有找到明确的分隔，返回原始内容作为答案，空字符串作为思考过程
+        return content, ""
+    
+    def chat(self,
+             messages: Sequence[BaseMessage],
+             on_token: Optional[Callable[[str], None]] = None) -> tuple[str, str]:
         """
         进行对话
         
         Args:
             messages: LangChain 消息列表
+            on_token: 可选的回调，传入时以流式方式请求，每收到一个文本片段即调用一次
             
         Returns:
             tuple[str, str]: (AI 的回复, 思考过程)
         """
         try:
-            # 构建思考提示
-            thinking_prompt = "请先思考如何回答这个问题，然后给出最终答案。思考过程要详细说明你的推理步骤。"
-            messages_with_thinking = messages + [SystemMessage(content=thinking_prompt)]
-            
-            # 获取回复
-            response = self.model.invoke(messages_with_thinking)
+            if on_token is None:
+                # 获取回复
+                response = self.model.invoke(self._with_thinking(messages))
+                return self.split_thinking(response.content)
             
-            # 分离思考过程和最终答案
-            content = response.content
-            if "思考过程：" in content:
-                thinking, answer = content.split("思考过程：", 1)
-                if "最终答案：" in answer:
-                    thinking, answer = answer.split("最终答案：", 1)
-                    return answer.strip(), thinking.strip()
-            
-            # 如果没有找到明确的分隔，返回原始内容作为答案，空字符串作为思考过程
-            return content, ""
+            # 复用 chat_stream 边接收边回调，结束后再分离思考过程和最终答案
+            chunks = []
+            for chunk in self.chat_stream(messages):
+                on_token(chunk)
+                chunks.append(chunk)
+            return self.split_thinking("".join(chunks))
             
         except Exception as e:
-            logger.error(f"对话出错: {str(e)}")
-            raise 
\ No newline at end of file
+            logger.error("对话出错: %s", e)
+            raise 
+    
+    def chat_stream(self, messages: Sequence[BaseMessage]) -> Iterator[str]:
+        """
+        流式对话，逐段返回模型输出
+        
+        Args:
+            messages: LangChain 消息列表
+        
+        Yields:
+            str: 模型输出的文本片段（包含思考过程和最终答案，需由调用方自行分离）
+        """
+        try:
+            for chunk in self.model.stream(self._with_thinking(messages)):
+                yield chunk.content
+        
+        except Exception as e:
+            logger.error("流式对话出错: %s", e)
+            raise 
+    
+    async def achat_batch(self, batch: List[Sequence[BaseMessage]]) -> List[Union[tuple[str, str], Exception]]:
+        """
+        并发处理一批对话请求（异步）
+        各请求互不影响：某条请求失败（如限流、内容审核）时，只有该位置返回异常对象
+        共享异步客户端的连接绑定在事件循环上，应始终在同一个常驻事件循环中调用（如 ChatAgent 共享的 Batcher 后台线程）
+        
+        Args:
+            batch: 每个元素是一次对话的 LangChain 消息列表
+        
+        Returns:
+            List[Union[tuple[str, str], Exception]]: 与输入顺序一致的 (AI 的回复, 思考过程) 或异常
+        """
+        responses = await asyncio.gather(
+            *(self.model.ainvoke(self._with_thinking(messages)) for messages in batch),
+            return_exceptions=True
+        )
+        results: List[Union[tuple[str, str], Exception]] = []
+        for response in responses:
+            if isinstance(response, Exception):
+                logger.error("批量对话出错: %s", response)
+                results.append(response)
+            else:
+                results.append(self.split_thinking(response.content))
+        return results
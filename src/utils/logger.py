@@ -2,30 +2,18 @@ import logging
 from typing import Optional
 from ..config import Config
 
+# 导入时配置一次根日志记录器，各模块的日志记录器都通过传播共用这一个处理器；
+# 根日志记录器已有处理器（如应用自行配置过）时 basicConfig 不做任何事
+logging.basicConfig(level=Config.LOG_LEVEL, format=Config.LOG_FORMAT)
+
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
     """
-    设置日志记录器
+    获取日志记录器
     
     Args:
         name: 日志记录器名称
         
     Returns:
-        logging.Logger: 配置好的日志记录器
+        logging.Logger: 日志记录器，输出由根日志记录器统一处理
     """
-    logger = logging.getLogger(name or __name__)
-    
-    if not logger.handlers:
-        logger.setLevel(Config.LOG_LEVEL)
-        
-        # 创建控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(Config.LOG_LEVEL)
-        
-        # 创建格式化器
-        formatter = logging.Formatter(Config.LOG_FORMAT)
-        console_handler.setFormatter(formatter)
-        
-        # 添加处理器到日志记录器
-        logger.addHandler(console_handler)
-    
-    return logger 
\ No newline at end of file
+    return logging.getLogger(name or __name__)
\ No newline at end of file
@@ -0,0 +1,49 @@
+import threading
+import pytest
+from src.chat.batcher import Batcher
+
+def _submit_together(batcher, items):
+    """在等待窗口内同时提交多条请求，保证它们落在同一批"""
+    return [batcher.submit(item) for item in items]
+
+def test_results_returned_to_each_caller():
+    """测试同一批中的每条请求拿到各自的结果"""
+    batches = []
+    
+    async def handler(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+    
+    batcher = Batcher(handler, max_batch=8, max_wait_ms=200)
+    futures = _submit_together(batcher, [1, 2, 3])
+    assert [f.result(timeout=5) for f in futures] == [2, 4, 6]
+    assert batches == [[1, 2, 3]]
+
+def test_failed_item_does_not_fail_batch():
+    """测试批中某条请求失败时，只有该请求抛出异常"""
+    async def handler(items):
+        return [ValueError("限流") if item == "bad" else item.upper() for item in items]
+    
+    batcher = Batcher(handler, max_batch=8, max_wait_ms=200)
+    ok, bad, ok2 = _submit_together(batcher, ["a", "bad", "b"])
+    assert ok.result(timeout=5) == "A"
+    assert ok2.result(timeout=5) == "B"
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+def test_handler_error_fails_whole_batch():
+    """测试批处理函数本身出错时，整批请求都以该异常结束，后台线程继续工作"""
+    calls = threading.Event()
+    
+    async def handler(items):
+        if not calls.is_set():
+            calls.set()
+            raise RuntimeError("连接失败")
+        return items
+    
+    batcher = Batcher(handler, max_batch=8, max_wait_ms=200)
+    futures = _submit_together(batcher, [1, 2])
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    assert batcher.submit(3).result(timeout=5) == 3
@@ -1,4 +1,7 @@
+import asyncio
 import pytest
+from langchain.schema import AIMessage, HumanMessage
+from langchain_core.messages import AIMessageChunk
 from src.models.chat_model import ChatModel
 from src.config import Config
 
@@ -11,4 +14,31 @@ def test_chat_model_config():
     """测试模型配置"""
     model = ChatModel()
     assert model.model.model_name == Config.DEFAULT_MODEL
-    assert model.model.temperature == Config.TEMPERATURE 
\ No newline at end of file
+    assert model.model.temperature == Config.TEMPERATURE 
+
+def test_achat_batch_isolates_failures():
+    """测试批量对话中单条请求失败时，其他请求仍返回结果"""
+    class FakeModel:
+        async def ainvoke(self, messages):
+            if messages[0].content == "bad":
+                raise RuntimeError("内容审核未通过")
+            return AIMessage(content="思考过程：想一想最终答案：" + messages[0].content)
+    
+    model = ChatModel()
+    model.model = FakeModel()
+    results = asyncio.run(model.achat_batch([[HumanMessage(content="ok")], [HumanMessage(content="bad")]]))
+    assert results[0] == ("ok", "想一想")
+    assert isinstance(results[1], RuntimeError)
+
+def test_chat_on_token_streams_chunks():
+    """测试传入 on_token 时逐段回调，并返回分离后的回复和思考过程"""
+    class FakeModel:
+        def stream(self, messages):
+            for text in ["思考过程：", "想一想", "最终答案：", "你好"]:
+                yield AIMessageChunk(content=text)
+    
+    model = ChatModel()
+    model.model = FakeModel()
+    tokens = []
+    assert model.chat([HumanMessage(content="hi")], on_token=tokens.append) == ("你好", "想一想")
+    assert tokens == ["思考过程：", "想一想", "最终答案：", "你好"]
@@ -0,0 +1,38 @@
+import json
+import pytest
+from src.data.json_loader import FastJSONLoader, _jq_to_jmespath
+
+def test_jq_to_jmespath():
+    """测试简单 jq 路径改写为 JMESPath 表达式"""
+    assert _jq_to_jmespath(".") is None
+    assert _jq_to_jmespath(".[]") == "[]"
+    assert _jq_to_jmespath(".messages[].content") == "messages[].content"
+    assert _jq_to_jmespath(".a.b") == "a.b"
+
+def test_rejects_complex_jq():
+    """测试复杂 jq 查询直接报错，而不是静默返回错误结果"""
+    with pytest.raises(ValueError):
+        _jq_to_jmespath(".[] | select(.role == \"user\")")
+    with pytest.raises(ValueError):
+        FastJSONLoader("unused.json", jq_schema=".messages[0]")
+
+def test_jq_schema_with_content_key(tmp_path):
+    """测试按 jq 路径选取元素并取出 content_key 字段，缺少该字段的元素被跳过"""
+    path = tmp_path / "chat.json"
+    path.write_text(json.dumps({"messages": [{"content": "你好"}, {"role": "system"}, {"content": {"a": 1}}]}),
+                    encoding="utf-8")
+    docs = FastJSONLoader(path, jq_schema=".messages[]", content_key="content").load()
+    assert len(docs) == 2
+    assert docs[0].page_content == "你好"
+    # 非字符串内容序列化为 JSON 文本
+    assert json.loads(docs[1].page_content) == {"a": 1}
+    assert [doc.metadata for doc in docs] == [{"source": str(path), "seq_num": 1},
+                                              {"source": str(path), "seq_num": 2}]
+
+def test_json_lines(tmp_path):
+    """测试 JSON Lines 文件每行分别查询，空行被忽略"""
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"text": "一"}\n\n{"text": "二"}\n{"other": 3}\n', encoding="utf-8")
+    docs = FastJSONLoader(path, query="text", json_lines=True).load()
+    assert [doc.page_content for doc in docs] == ["一", "二"]
+    assert [doc.metadata["seq_num"] for doc in docs] == [1, 2]
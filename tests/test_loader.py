@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import pytest
+from langchain_core.embeddings import FakeEmbeddings
+from src.data.loader import DataLoader, _make_text_splitter, _split_file, _split_pdf_in_processes
+
+def _make_loader(tmp_path, persist=False, **kwargs):
+    """创建使用临时目录和假嵌入模型的数据加载器"""
+    return DataLoader(cache_dir=str(tmp_path / "cache"),
+                      persist_dir=str(tmp_path / "db") if persist else None,
+                      embeddings=FakeEmbeddings(size=8),
+                      **kwargs)
+
+def _write_pdf(path, n_pages):
+    """生成每页一行文本的 PDF，带有 PDF 信息字典"""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+    
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"),
+                             NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    writer = PdfWriter()
+    for i in range(n_pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        content = DecodedStreamObject()
+        content.set_data(b"BT /F1 12 Tf 72 720 Td (Page %d text) Tj ET" % i)
+        page.replace_contents(content)
+    writer.add_metadata({"/Producer": "test", "/Title": "Sample", "/CreationDate": "D:20240101120000+00'00'"})
+    writer.write(path)
+
+def test_parallel_pdf_matches_pypdf_loader(tmp_path, monkeypatch):
+    """测试按页并行提取的 PDF 与 PyPDFLoader 顺序加载的文本和元数据一致"""
+    pytest.importorskip("pypdf")
+    path = str(tmp_path / "a.pdf")
+    _write_pdf(path, 20)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    splitter = _make_text_splitter(1000, 200)
+    parallel = _split_pdf_in_processes(path, splitter)
+    assert parallel is not None
+    sequential = _split_file(path, "pdf", splitter)
+    assert [(d.page_content, d.metadata) for d in parallel] == [(d.page_content, d.metadata) for d in sequential]
+    assert parallel[3].metadata["producer"] == "test" and parallel[3].metadata["page"] == 3
+
+def test_cache_hit_returns_same_documents(tmp_path):
+    """测试缓存命中时返回与首次加载相同的文档列表"""
+    path = tmp_path / "a.txt"
+    path.write_text("第一段。\n\n" + "内容" * 800, encoding="utf-8")
+    loader = _make_loader(tmp_path)
+    docs = loader.load(path)
+    cached = loader.load(path)
+    assert isinstance(cached, list)
+    assert len(cached) == len(docs) > 1
+    assert [(d.page_content, d.metadata) for d in cached] == [(d.page_content, d.metadata) for d in docs]
+
+def test_loaders_share_cache_env(tmp_path):
+    """测试同一缓存目录的多个加载器共用一个 LMDB 环境，可读到彼此写入的缓存"""
+    path = tmp_path / "a.txt"
+    path.write_text("共享缓存", encoding="utf-8")
+    first = _make_loader(tmp_path)
+    second = _make_loader(tmp_path)
+    assert first._env is second._env
+    first.load(path)
+    cache_key, cached = second._get_cached(path, "txt", {})
+    assert cached is not None and cached[0].page_content == "共享缓存"
+
+def test_cache_key_includes_loader_kwargs(tmp_path):
+    """测试加载器参数不同时不会命中其他参数的缓存"""
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps({"a": "甲", "b": "乙"}), encoding="utf-8")
+    loader = _make_loader(tmp_path)
+    assert loader.load(path, query="a")[0].page_content == "甲"
+    assert loader.load(path, query="b")[0].page_content == "乙"
+
+def test_map_full_does_not_fail_load(tmp_path):
+    """测试缓存写不下时只跳过缓存，加载仍然成功"""
+    path = tmp_path / "big.txt"
+    path.write_text("\n\n".join("段落%d " % i * 50 for i in range(3000)), encoding="utf-8")
+    loader = _make_loader(tmp_path, cache_map_size=1 << 20)
+    docs = loader.load(path)
+    assert len(docs) > 1
+    assert loader._get_cached(path, "txt", {})[1] is None
+
+def test_skips_duplicate_chunks(tmp_path):
+    """测试内容相同的文本块只写入向量数据库一次，重启后去重索引仍然有效"""
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("重复的内容", encoding="utf-8")
+    with _make_loader(tmp_path, persist=True) as loader:
+        loader.load(tmp_path / "a.txt")
+        loader.load(tmp_path / "b.txt")
+    assert loader.vectorstore._collection.count() == 1
+    
+    reopened = _make_loader(tmp_path, persist=True)
+    assert len(reopened._seen) == 1
+    reopened.load(tmp_path / "b.txt")
+    assert reopened._pending == []
+
+def test_failed_flush_is_retried(tmp_path, monkeypatch):
+    """测试写入向量数据库失败的文本块不会被当作已写入，重新加载后补写"""
+    path = tmp_path / "a.txt"
+    path.write_text("写入失败的内容", encoding="utf-8")
+    loader = _make_loader(tmp_path, persist=True)
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("网络错误")
+    
+    with monkeypatch.context() as m:
+        m.setattr(loader.vectorstore, "add_documents", fail)
+        loader.load(path)
+        with pytest.raises(RuntimeError):
+            loader.flush()
+    assert loader._seen == set() and loader._pending == []
+    
+    loader.load(path)  # 缓存命中，补入待写入队列
+    loader.flush()
+    assert loader.vectorstore._collection.count() == 1
+
+def test_failed_aload_is_retried(tmp_path, monkeypatch):
+    """测试异步写入失败的文本块不会被当作已写入，再次加载时重新写入"""
+    path = tmp_path / "a.txt"
+    path.write_text("异步写入失败的内容", encoding="utf-8")
+    loader = _make_loader(tmp_path, persist=True)
+    
+    async def fail(*args, **kwargs):
+        raise RuntimeError("网络错误")
+    
+    with monkeypatch.context() as m:
+        m.setattr(loader.vectorstore, "aadd_documents", fail)
+        with pytest.raises(RuntimeError):
+            asyncio.run(loader.aload(path))
+    assert loader._seen == set()
+    
+    asyncio.run(loader.aload(path))
+    assert loader.vectorstore._collection.count() == 1
+
+def _write_texts(tmp_path, n):
+    """生成 n 个内容各不相同的文本文件"""
+    paths = []
+    for i in range(n):
+        path = tmp_path / ("doc%d.txt" % i)
+        path.write_text(("第%d个文件的内容。" % i) * 150, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+def test_process_batch_load_matches_load(tmp_path):
+    """测试文件较多时进程池批量加载的结果与逐个加载一致，且全部写入向量数据库"""
+    paths = _write_texts(tmp_path, 10)
+    expected = [_split_file(str(path), "txt", _make_text_splitter(1000, 200)) for path in paths]
+    loader = _make_loader(tmp_path, persist=True)
+    results = loader.batch_load(paths, max_workers=2)
+    assert [[d.page_content for d in docs] for docs in results] == [[d.page_content for d in docs] for docs in expected]
+    assert loader._pending == []
+    assert loader.vectorstore._collection.count() == len({d.page_content for docs in expected for d in docs})
+    # 再次加载全部命中缓存，结果不变
+    assert [[d.page_content for d in docs] for docs in loader.batch_load(paths)] == \
+        [[d.page_content for d in docs] for docs in results]
+
+def test_thread_batch_load_matches_load(tmp_path):
+    """测试文件较少时线程池批量加载的结果与逐个加载一致，且结束时写入剩余文本块"""
+    paths = _write_texts(tmp_path, 4)
+    loader = _make_loader(tmp_path, persist=True)
+    results = loader.batch_load(paths, max_workers=4)
+    assert loader._pending == []
+    assert loader.vectorstore._collection.count() == len({d.page_content for docs in results for d in docs})
+    
+    separate = _make_loader(tmp_path / "separate")
+    assert [[d.page_content for d in docs] for docs in results] == \
+        [[d.page_content for d in separate.load(path)] for path in paths]
@@ -0,0 +1,29 @@
+from langchain.schema import AIMessage, HumanMessage
+from src.chat.memory import ConversationMemory
+
+def test_restores_recent_messages(tmp_path):
+    """测试重启后按会话恢复最近的 max_history 条消息"""
+    db_path = tmp_path / "memory.sqlite3"
+    memory = ConversationMemory(max_history=2, db_path=db_path)
+    memory.add_message(HumanMessage(content="一"))
+    memory.add_message(AIMessage(content="二"))
+    memory.add_message(HumanMessage(content="三"))
+    ConversationMemory(session_id="other", db_path=db_path).add_message(HumanMessage(content="其他"))
+    
+    restored = ConversationMemory(max_history=2, db_path=db_path).get_messages()
+    assert [(m.type, m.content) for m in restored] == [("ai", "二"), ("human", "三")]
+
+def test_clear_removes_stored_messages(tmp_path):
+    """测试清空历史记录后重启不再恢复"""
+    db_path = tmp_path / "memory.sqlite3"
+    memory = ConversationMemory(db_path=db_path)
+    memory.add_message(HumanMessage(content="一"))
+    memory.clear()
+    assert ConversationMemory(db_path=db_path).get_messages() == []
+
+def test_falls_back_to_memory(tmp_path):
+    """测试数据库无法打开时退回只在内存中保存"""
+    memory = ConversationMemory(db_path=tmp_path)  # 目录不能作为数据库文件打开
+    memory.add_message(HumanMessage(content="一"))
+    assert memory._conn is None
+    assert [m.content for m in memory.get_messages()] == ["一"]
@@ -0,0 +1,70 @@
+import sys
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.chat.agent import ChatAgent
+from src.chat.cache import ResponseCache
+
+def test_evicts_least_recently_used():
+    """测试超出条目上限时淘汰最久未使用的条目"""
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "ctx", None, ("A", ""))
+    cache.put("b", "ctx", None, ("B", ""))
+    assert cache.get("a", "ctx") == ("A", "")  # a 变为最近使用
+    cache.put("c", "ctx", None, ("C", ""))
+    assert cache.get("b", "ctx") is None
+    assert cache.get("a", "ctx") == ("A", "")
+    assert cache.get("c", "ctx") == ("C", "")
+
+def test_eviction_removes_semantic_rows():
+    """测试淘汰条目时一并删除语义层中对应的行"""
+    cache = ResponseCache(max_entries=2)
+    x = np.array([1, 0], dtype=np.float32)
+    y = np.array([0, 1], dtype=np.float32)
+    cache.put("a", "ctx", x, ("A", ""))
+    cache.put("b", "ctx", y, ("B", ""))
+    assert cache.get("other", "ctx", x) == ("A", "")
+    cache.put("c", "ctx2", y, ("C", ""))
+    # 语义命中过的 a 是最近使用的，被淘汰的是 b
+    assert cache.get("other", "ctx", y) is None
+    assert cache.get("other", "ctx", x) == ("A", "")
+    assert len(cache.semantic["ctx"][3]) == 1
+
+def test_persists_atomically(tmp_path):
+    """测试缓存写入磁盘后可重新加载，且不残留临时文件"""
+    path = tmp_path / "responses.pkl"
+    cache = ResponseCache(path=path, max_entries=10)
+    cache.put("a", "ctx", None, ("A", "思考"))
+    assert list(tmp_path.iterdir()) == [path]
+    assert ResponseCache(path=path).get("a", "ctx") == ("A", "思考")
+    assert ResponseCache(path=path, max_entries=0).exact == {}
+
+def test_concurrent_puts_keep_all_entries(tmp_path, caplog):
+    """测试多线程共用缓存并发写入时，所有条目都能保存且不残留临时文件"""
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # 频繁切换线程，让竞争更容易出现
+    path = tmp_path / "responses.pkl"
+    cache = ResponseCache(path=path, max_entries=100)
+    
+    def worker(i):
+        for j in range(10):
+            key = "%s-%s" % (i, j)
+            cache.put(key, "ctx", None, (key, ""))
+            assert cache.get(key, "ctx") == (key, "")
+    
+    try:
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(worker, range(5)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert "保存回复缓存失败" not in caplog.text
+    assert list(tmp_path.iterdir()) == [path]
+    assert len(ResponseCache(path=path, max_entries=100).exact) == 50
+
+def test_agents_share_cache_per_path(tmp_path):
+    """测试同一路径的回复缓存只创建一个实例，一个代理写入的条目不会被另一个覆盖"""
+    path = str(tmp_path / "responses.pkl")
+    first = ChatAgent._get_cache(path)
+    assert ChatAgent._get_cache(path) is first
+    first.put("a", "ctx", None, ("A", ""))
+    ChatAgent._get_cache(path).put("b", "ctx", None, ("B", ""))
+    assert set(ResponseCache(path=path).exact) == {"a", "b"}
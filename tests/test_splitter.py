@@ -0,0 +1,41 @@
+from src.data.splitter import RegexTextSplitter
+
+SEPARATORS = ["\n\n", "\n", "。", "！", "？", ".", "!", "?", " ", ""]
+
+def test_chunks_respect_chunk_size():
+    """测试文本块长度不超过 chunk_size"""
+    splitter = RegexTextSplitter(chunk_size=100, chunk_overlap=20, separators=SEPARATORS)
+    chunks = splitter.split_text("这是一个句子。" * 200)
+    assert len(chunks) > 1
+    assert all(0 < len(chunk) <= 100 for chunk in chunks)
+
+def test_chunks_split_on_separators_with_overlap():
+    """测试在分隔符处切分，且相邻块有重叠"""
+    splitter = RegexTextSplitter(chunk_size=50, chunk_overlap=20, separators=SEPARATORS)
+    chunks = splitter.split_text("hello world " * 20)
+    assert all(set(chunk.split(" ")) <= {"hello", "world"} for chunk in chunks)
+    assert chunks[1].startswith(chunks[0].split(" ", 5)[-1])
+
+def test_hard_split_keeps_overlap():
+    """测试没有分隔符时按 chunk_size 硬切分，并保留 chunk_overlap 个字符的重叠"""
+    splitter = RegexTextSplitter(chunk_size=1000, chunk_overlap=200, separators=SEPARATORS)
+    text = "".join(chr(ord("a") + i % 26) for i in range(2500))
+    chunks = splitter.split_text(text)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 900]
+    assert list(chunks) == [text[:1000], text[800:1800], text[1600:]]
+
+def test_prefers_higher_priority_separator():
+    """测试窗口内有段落分隔时在段落处切分，而不是在更靠后的空格处"""
+    splitter = RegexTextSplitter(chunk_size=1000, chunk_overlap=200, separators=SEPARATORS)
+    text = "第一段的内容，" * 60 + "结束。\n\n第二段 " + "English words here. " * 80
+    chunks = splitter.split_text(text)
+    assert chunks[0] == "第一段的内容，" * 60 + "结束。"
+    assert chunks[1].startswith("第二段")
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+
+def test_hard_split_with_full_overlap_advances():
+    """测试 chunk_overlap 等于 chunk_size 时硬切分仍逐字符前进，不会死循环"""
+    splitter = RegexTextSplitter(chunk_size=10, chunk_overlap=10, separators=SEPARATORS)
+    chunks = splitter.split_text("x" * 100)
+    assert len(chunks) == 91
+    assert all(chunk == "x" * 10 for chunk in chunks)